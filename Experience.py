@@ -1,4 +1,14 @@
+import sys
+
+
 class Experience:
+    # Fixed attribute layout: no per-instance __dict__
+    __slots__ = ("position", "company_name", "employment_type", "location", "description", "media",
+                 "start_date", "end_date")
+
+    # Low-cardinality values shared by many profiles, interned by compact()
+    INTERNED_FIELDS = ("position", "company_name", "employment_type", "location")
+
     def __init__(self):
         self.position = ""
         self.company_name = ""
@@ -16,3 +26,26 @@ class Experience:
         else:
             date = "ERROR"
         return f"     Position: {self.position}\n     Company Name: {self.company_name}\n     Employment Type: {self.employment_type}\n     Location: {self.location}\n     Dates: {date}\n"
+
+    def compact(self):
+        for field in self.INTERNED_FIELDS:
+            value = getattr(self, field)
+            if type(value) is str:
+                setattr(self, field, sys.intern(value))
+        return self
+
+    def __toDict__(self):
+        return {'position': self.position, 'company_name': self.company_name, 'employment_type': self.employment_type, 'location': self.location, 'description': self.description, 'start_date': self.start_date, 'end_date': self.end_date}
+
+    def __toRows__(self):
+        # Column values of the experiences row and of the employee_experience row (dates still unparsed)
+        return {'position': self.position, 'company_name': self.company_name}, \
+               {'start_date': self.start_date, 'end_date': self.end_date, 'location': self.location,
+                'description': self.description, 'employment_type': self.employment_type}
+
+    @classmethod
+    def __fromDict__(cls, expDict):
+        exp = cls()
+        for field, value in expDict.items():
+            setattr(exp, field, value)
+        return exp
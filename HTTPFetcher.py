@@ -0,0 +1,166 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from PageArchive import PageArchive, PROFILE, EXPERIENCE, EDUCATION, SKILLS
+from RateController import AUTHWALL, THROTTLED
+
+"""
+HTTPFetcher
+
+Description:
+    Fetches server-rendered pages over a pooled keep-alive HTTP session that carries the cookies of
+    a logged-in Selenium session, so a page costs one request instead of a full Chrome render.
+    The scraper parses what it fetches with LinkedInPageParser and falls back to the browser
+    whenever the content it needs is missing (client-rendered page, auth wall, error status).
+    Pages are requested from baseURL, so a local stand-in server can replace LinkedIn: ArchiveServer
+    serves the pages of a PageArchive at the paths they were scraped from.
+    With a RateController every request waits for its turn, and 429 responses and auth walls are
+    reported to it as soft blocks.
+
+Usage:
+    python HTTPFetcher.py pageArchive.db [port]     (serves the archive on http://localhost:port)
+"""
+
+LINKEDIN_URL = "https://www.linkedin.com"
+# Keep-alive connections kept open per host
+HTTP_POOL_SIZE = 4
+HTTP_TIMEOUT = 10
+ARCHIVE_SERVER_PORT = 8765
+
+# Responses that mean the cookies are no longer accepted
+__LOGIN_PATHS__ = ("/authwall", "/login", "/checkpoint", "/uas/login")
+
+# Archive section of each path suffix served by ArchiveServer
+__SECTION_SUFFIXES__ = {"/details/experience": EXPERIENCE, "/details/education": EDUCATION,
+                        "/details/skills": SKILLS}
+
+
+class HTTPFetcher:
+    def __init__(self, baseURL=LINKEDIN_URL, poolSize=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, rateController=None):
+        self.baseURL = baseURL.rstrip("/")
+        self.timeout = timeout
+        self.rateController = rateController
+
+        self.fetched = 0
+        self.missed = 0
+
+        self.__session__ = requests.Session()
+        adapter = HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize)
+        self.__session__.mount("http://", adapter)
+        self.__session__.mount("https://", adapter)
+
+    def copyCookies(self, driver):
+        ''' Copies the cookies and user agent of a logged-in WebDriver session '''
+        self.__session__.cookies.clear()
+        for cookie in driver.get_cookies():
+            self.__session__.cookies.set(cookie["name"], cookie["value"], path=cookie.get("path", "/"))
+        self.__session__.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+
+    def rebase(self, URL):
+        ''' The URL of a LinkedIn page on baseURL '''
+        parts = urlsplit(URL)
+        return self.baseURL + parts.path + (("?" + parts.query) if parts.query else "")
+
+    def fetch(self, URL):
+        ''' Returns the HTML of the page at URL, or None if it must be loaded in the browser '''
+        if self.rateController is not None:
+            self.rateController.acquire()
+
+        try:
+            response = self.__session__.get(self.rebase(URL), timeout=self.timeout)
+        except requests.RequestException as error:
+            print("HTTP fetch failed for", URL, error)
+            self.missed += 1
+            return None
+
+        if response.status_code == 429:
+            if self.rateController is not None:
+                retryAfter = response.headers.get("Retry-After", "")
+                self.rateController.blocked(THROTTLED, int(retryAfter) if retryAfter.isdigit() else None)
+            self.missed += 1
+            return None
+
+        if urlsplit(response.url).path.startswith(__LOGIN_PATHS__):
+            if self.rateController is not None:
+                self.rateController.blocked(AUTHWALL)
+            self.missed += 1
+            return None
+
+        if response.status_code != 200:
+            self.missed += 1
+            return None
+
+        self.fetched += 1
+        return response.text
+
+    def close(self):
+        self.__session__.close()
+
+
+class ArchiveServer:
+    ''' Local HTTP server serving the latest archived HTML of each page at its LinkedIn path '''
+
+    def __init__(self, archive: PageArchive, port=ARCHIVE_SERVER_PORT):
+        def handlerFactory(*args):
+            return __ArchiveRequestHandler__(archive, *args)
+
+        self.server = ThreadingHTTPServer(("localhost", port), handlerFactory)
+        self.baseURL = f"http://localhost:{self.server.server_address[1]}"
+        self.__thread__ = None
+
+    def start(self):
+        self.__thread__ = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.__thread__.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class __ArchiveRequestHandler__(BaseHTTPRequestHandler):
+    def __init__(self, archive, *args):
+        self.archive = archive
+        super().__init__(*args)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        section = PROFILE
+        for suffix, suffixSection in __SECTION_SUFFIXES__.items():
+            if path.endswith(suffix):
+                path = path[:-len(suffix)]
+                section = suffixSection
+                break
+
+        pageSource = self.archive.latest(LINKEDIN_URL + path, section)
+        if pageSource is None:
+            self.send_error(404)
+            return
+
+        body = pageSource.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Driver Code
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or not os.path.exists(sys.argv[1]):
+        print("Usage: python HTTPFetcher.py pageArchive.db [port]")
+        sys.exit(1)
+
+    server = ArchiveServer(PageArchive(sys.argv[1]),
+                           int(sys.argv[2]) if len(sys.argv) > 2 else ARCHIVE_SERVER_PORT)
+    print("Serving", sys.argv[1], "on", server.baseURL)
+    server.server.serve_forever()
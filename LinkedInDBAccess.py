@@ -2,20 +2,102 @@
 # Or could send the employee data in bulk and make insertions locally
 # Is this possible to bulk insert?
 
-import mysql.connector
-from mysql.connector import Error
-from datetime import datetime, date
+from collections import OrderedDict
+from datetime import datetime
+import time
 
 from Employee import Employee
 from Education import Education
 from Experience import Experience
+from URLIndex import ProfileURLIndex
+from DateRangeParser import ToDate
+from SkillNormalizer import SkillNormalizer, SKILL_ALIASES_PATH
+from PageArchive import PROFILE, EXPERIENCE, EDUCATION, SKILLS
 
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, ForeignKey, Table, Date, UniqueConstraint
+from sqlalchemy import create_engine, inspect, select, update, delete, and_, or_, tuple_, Column, String, Text, DateTime, Integer, ForeignKey, Table, Date, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import OperationalError, InterfaceError
+from sqlalchemy.dialects.mysql import insert as mysqlInsert
+from sqlalchemy.dialects.postgresql import insert as postgresqlInsert
+from sqlalchemy.dialects.sqlite import insert as sqliteInsert
 
 Base = declarative_base()
 
+# Upper bound on the number of natural keys kept in each dimension table's lookup cache
+EXPERIENCE_CACHE_SIZE = 100000
+EDUCATION_CACHE_SIZE = 50000
+SKILL_CACHE_SIZE = 50000
+
+# Number of (id, user_url) rows fetched per round trip when streaming profile URLs
+URL_STREAM_CHUNK_SIZE = 10000
+
+# Dimension rows written per upsert statement (keeps SQLite under its bound parameter limit)
+UPSERT_CHUNK_SIZE = 250
+# Dialects with an INSERT that skips existing keys (others read before write)
+UPSERT_DIALECTS = ("mysql", "sqlite", "postgresql")
+
+# Natural keys of the dimension tables (their unique constraints)
+EXPERIENCE_KEY = ('position', 'company_name')
+EDUCATION_KEY = ('institution', 'degree', 'degree_type')
+SKILL_KEY = ('skill', 'category')
+
+# A transaction chosen as a deadlock victim (MySQL error 1213) is retried this many times
+DEADLOCK_RETRIES = 3
+MYSQL_DEADLOCK = 1213
+
+
+def __isDeadlock__(error):
+    return getattr(getattr(error, "orig", None), "errno", None) == MYSQL_DEADLOCK
+
+
+def __columnValues__(row):
+    ''' Column values of an ORM row for Core bulk inserts, without the id the database assigns '''
+    return {column.key: getattr(row, column.key) for column in row.__table__.columns if column.key != 'id'}
+
+
+class LookupCache:
+    ''' Bounded LRU map from a dimension table's natural key to the id of its row '''
+
+    def __init__(self, maxSize):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.__entries__ = OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries__)
+
+    def __contains__(self, key):
+        return key in self.__entries__
+
+    def get(self, key):
+        rowId = self.__entries__.get(key)
+        if rowId is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__entries__.move_to_end(key)
+        return rowId
+
+    def put(self, key, rowId):
+        self.__entries__[key] = rowId
+        self.__entries__.move_to_end(key)
+
+        if len(self.__entries__) > self.maxSize:
+            self.__entries__.popitem(last=False)
+
+    def putAll(self, pairs):
+        for key, rowId in pairs:
+            self.put(key, rowId)
+
+    def discard(self, keys):
+        for key in keys:
+            self.__entries__.pop(key, None)
+
+    def clear(self):
+        self.__entries__.clear()
+
 
 class EmployeeEducation(Base):
     __tablename__ = 'employee_education'
@@ -51,7 +133,9 @@ employee_skill = Table('employee_skill', Base.metadata,
                        Column('emp_id', Integer, ForeignKey(
                            'employees.id'), primary_key=True),
                        Column('skill_id', Integer, ForeignKey(
-                           'skills.id'), primary_key=True)
+                           'skills.id'), primary_key=True),
+                       # Skill -> employees joins (the primary key only covers employee -> skills)
+                       Index('ix_employee_skill_skill_id', 'skill_id')
                        )
 
 
@@ -82,7 +166,7 @@ class Education(Base):
     institution = Column(String(100))
     degree = Column(String(100))
     degree_type = Column(String(100))
-    UniqueConstraint(institution, degree, degree_type)
+    __table_args__ = (UniqueConstraint('institution', 'degree', 'degree_type'),)
 
 
 class Experience(Base):
@@ -91,7 +175,7 @@ class Experience(Base):
     id = Column(Integer, primary_key=True)
     position = Column(String(100))
     company_name = Column(String(100))
-    UniqueConstraint(position, company_name)
+    __table_args__ = (UniqueConstraint('position', 'company_name'),)
 
 
 class Skill(Base):
@@ -99,18 +183,50 @@ class Skill(Base):
     id = Column(Integer, primary_key=True)
     skill = Column(String(100))
     category = Column(String(100))
-    UniqueConstraint(skill, category)
+    __table_args__ = (UniqueConstraint('skill', 'category'),)
+
+
+class ProfileFingerprint(Base):
+    # Content hash of each scraped section of a profile (PROFILE, EXPERIENCE, EDUCATION, SKILLS)
+    __tablename__ = 'profile_fingerprints'
+    emp_id = Column('emp_id', Integer, ForeignKey(
+        'employees.id'), primary_key=True)
+    section = Column('section', String(20), primary_key=True)
+    fingerprint = Column('fingerprint', String(64))
+    # Last time the section was loaded, and last time its content changed
+    checked_at = Column('checked_at', DateTime)
+    changed_at = Column('changed_at', DateTime)
+    # Stalest profiles first
+    __table_args__ = (Index('ix_profile_fingerprints_checked_at', 'section', 'checked_at'),)
 
 
 class LinkedInDB:
-    def __init__(self, database, host, port, user, password):
+    def __init__(self, database, host, port, user, password, url=None, skillAliasesPath=SKILL_ALIASES_PATH):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
-        self.engine = create_engine(
-            f"mysql+mysqlconnector://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}")
+        # Any SQLAlchemy URL may replace the MySQL server (e.g. sqlite:///linkedin.db for local runs)
+        if url is None:
+            url = f"mysql+mysqlconnector://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+        self.engine = create_engine(url)
+
+        # Process-wide natural key -> id caches for the dimension tables
+        # Entries are only published after the transaction that read or created them commits
+        self.__experienceCache__ = LookupCache(EXPERIENCE_CACHE_SIZE)
+        self.__educationCache__ = LookupCache(EDUCATION_CACHE_SIZE)
+        self.__skillCache__ = LookupCache(SKILL_CACHE_SIZE)
+        self.__cachesWarm__ = False
+
+        # Process-wide index of the profiles in the employees table, synced incrementally
+        self.__employeeURLIndex__ = None
+
+        # Dimension tables whose natural key has a unique constraint in the database, checked on first write
+        self.__upsertTables__ = None
+
+        # Raw skill string -> canonical skill name, applied before skills are looked up or inserted
+        self.skillNormalizer = SkillNormalizer.fromFile(skillAliasesPath)
 
     def __connect__(self):
         ''' Connect to MySQL database '''
@@ -124,14 +240,44 @@ class LinkedInDB:
         Base.metadata.create_all(self.engine)
 
     def __loadEmployeeURLs__(self):
-        session = self.__connect__()
-        employeeURLs = set()
-
-        for instance in session.query(Employee).order_by(Employee.id):
-            employeeURLs.add(instance.user_url)
-
-        session.close()
-        return employeeURLs
+        return {user_url for _, user_url in self.streamEmployeeURLs()}
+
+    def streamEmployeeURLs(self, afterId=0, chunkSize=URL_STREAM_CHUNK_SIZE):
+        ''' Yields (id, user_url) of the profiles with an id above afterId, in id order '''
+        # Column-only select, one page of ids at a time, so no Employee objects are built and the
+        # result is never held in memory at once (mysqlconnector has no server-side cursors)
+        with self.engine.connect() as connection:
+            while True:
+                partition = connection.execute(
+                    select(Employee.id, Employee.user_url).
+                    where(Employee.id > afterId).order_by(Employee.id).limit(chunkSize)).all()
+                if not partition:
+                    return
+                afterId = partition[-1].id
+
+                for row in partition:
+                    yield row
+
+    def syncEmployeeURLs(self, index: ProfileURLIndex):
+        ''' Merges the profiles inserted since the index's high-water mark; returns how many '''
+        added = 0
+        for empId, user_url in self.streamEmployeeURLs(index.highWaterMark):
+            if user_url is not None:
+                index.add(user_url)
+            index.highWaterMark = empId
+            added += 1
+
+        index.flush()
+        return added
+
+    def employeeURLIndex(self, bloom=False, capacity=5000000, path=None):
+        ''' The process-wide index of profiles in the database, brought up to date '''
+        if self.__employeeURLIndex__ is None:
+            self.__employeeURLIndex__ = ProfileURLIndex(
+                bloom, capacity, path=path)
+
+        self.syncEmployeeURLs(self.__employeeURLIndex__)
+        return self.__employeeURLIndex__
 
     def __checkIfDuplicateProfile__(self, url):
         session = self.__connect__()
@@ -145,94 +291,445 @@ class LinkedInDB:
 
         return True
 
-    def insertEmployees(self, employeeList):
-        session = self.__connect__()
-        for employee in employeeList:
-            emp, experiences, educations, skills = self.__extractTableTuples__(
-                employee)
-            employeeDupe = session.query(Employee). \
-                filter(Employee.user_url == emp.user_url).first()
-
-            if employeeDupe is not None:
-                print(emp.user_url, "is a duplicate")
-                continue
-
-            expList = {}
-            for exp in experiences:
-                experience = None
-                expTuple = (exp[0].position, exp[0].company_name)
-
-                # Sometimes, there are duplicate experiences before those experiences are entered into the DB
-                # For instance, someone works for Tesla as an Intern twice while no one else has worked
-                # the same position, company pair before. The query below will return nothing despite already adding
-                # the new position, company pair earlier in the for loop.
-                if expTuple in expList:
-                    experience = expList[expTuple]
+    def checkUniqueKeys(self):
+        '''
+        Returns the dimension tables that can be upserted: those whose natural key is enforced by
+        a unique constraint or index. create_all doesn't add constraints to tables that already
+        exist, so the others are written read-before-write, as they were before the constraints.
+        '''
+        if self.__upsertTables__ is not None:
+            return self.__upsertTables__
+
+        upsertTables = set()
+        if self.engine.dialect.name in UPSERT_DIALECTS:
+            inspector = inspect(self.engine)
+            for model, keyNames in ((Experience, EXPERIENCE_KEY), (Education, EDUCATION_KEY), (Skill, SKILL_KEY)):
+                table = model.__tablename__
+                uniqueKeys = [constraint['column_names'] for constraint in inspector.get_unique_constraints(table)]
+                uniqueKeys += [index['column_names'] for index in inspector.get_indexes(table) if index['unique']]
+                if any(set(columns) == set(keyNames) for columns in uniqueKeys):
+                    upsertTables.add(table)
                 else:
-                    # Check if the tuple exists in the database
-                    experience = session.query(Experience). \
-                        filter(Experience.position == exp[0].position,
-                               Experience.company_name == exp[0].company_name).first()
-
-                    if experience is None:
-                        experience = exp[0]
-                        session.add(exp[0])
-
-                    # Since the tuple didn't exist before, we add it to the dictionary
-                    expList[expTuple] = experience
-
-                exp[1].experience = experience
-                # Append association object only
-                emp.experiences.append(exp[1])
-                session.add(exp[1])
-
-            eduList = {}
-            for edu in educations:
-                education = None
-                eduTuple = (edu[0].institution,
-                            edu[0].degree, edu[0].degree_type)
-
-                if eduTuple in eduList:
-                    education = eduList[eduTuple]
-                else:
-                    education = session.query(Education). \
-                        filter(Education.institution == edu[0].institution, Education.degree == edu[0].degree,
-                               Education.degree_type == edu[0].degree_type).first()
-
-                    if education is None:
-                        education = edu[0]
-                        session.add(edu[0])
+                    print("WARNING:", table, "has no unique key on", ", ".join(keyNames) + ",",
+                          "writing it without upserts. Remove duplicate rows, then run:",
+                          f"CREATE UNIQUE INDEX uq_{table}_key ON {table} ({', '.join(keyNames)})")
 
-                    eduList[eduTuple] = education
+        self.__upsertTables__ = upsertTables
+        return upsertTables
 
-                edu[1].education = education
-                # Append association object only
-                emp.educations.append(edu[1])
-                session.add(edu[1])
+    def warmCaches(self):
+        ''' Bulk load the most recent rows of each dimension table into the lookup caches '''
+        if self.__cachesWarm__:
+            return
 
-            skillList = {}
-            for skill in skills:
-                ski = None
-                skillTuple = (skill.skill, skill.category)
-
-                if skillTuple in skillList:
-                    ski = skillList[skillTuple]
-                else:
-                    ski = session.query(Skill). \
-                        filter(Skill.skill == skill.skill,
-                               Skill.category == skill.category).first()
-
-                    if ski is None:
-                        ski = skill
-                        session.add(skill)
+        session = self.__connect__()
+        try:
+            rows = session.query(Experience.id, Experience.position, Experience.company_name). \
+                order_by(Experience.id.desc()).limit(self.__experienceCache__.maxSize).all()
+            # Oldest first, so the most recent rows end up as the most recently used
+            self.__experienceCache__.putAll(
+                ((position, company_name), expId) for expId, position, company_name in reversed(rows))
+
+            rows = session.query(Education.id, Education.institution, Education.degree, Education.degree_type). \
+                order_by(Education.id.desc()).limit(self.__educationCache__.maxSize).all()
+            self.__educationCache__.putAll(
+                ((institution, degree, degree_type), eduId) for eduId, institution, degree, degree_type in reversed(rows))
+
+            rows = session.query(Skill.id, Skill.skill, Skill.category). \
+                order_by(Skill.id.desc()).limit(self.__skillCache__.maxSize).all()
+            self.__skillCache__.putAll(
+                ((skill, category), skillId) for skillId, skill, category in reversed(rows))
+
+            # Every existing name, oldest first, so new spellings map onto the rows already there
+            self.skillNormalizer.learn(
+                skill for skill, in session.query(Skill.skill).order_by(Skill.id).yield_per(URL_STREAM_CHUNK_SIZE))
+        finally:
+            session.close()
+
+        self.__cachesWarm__ = True
+
+    def clearCaches(self):
+        self.__experienceCache__.clear()
+        self.__educationCache__.clear()
+        self.__skillCache__.clear()
+        self.__cachesWarm__ = False
+
+    def __lookupId__(self, session, cache, pending, key, row, *criteria):
+        ''' Resolve the id of a dimension row: transaction-local keys, then the cache, then the database '''
+        rowId = pending.get(key)
+        if rowId is not None:
+            return rowId
+
+        rowId = cache.get(key)
+        if rowId is None:
+            found = session.query(type(row).id).filter(*criteria).first()
+
+            if found is None:
+                session.add(row)
+                # Flush to have the database assign the id of the new row
+                # If another writer inserted the same row first, the unique constraint fails the
+                # transaction and insertEmployees' per-employee retry finds the committed row
+                session.flush()
+                rowId = row.id
+            else:
+                rowId = found[0]
+
+        pending[key] = rowId
+        return rowId
 
-                    skillList[skillTuple] = ski
+    def insertEmployees(self, employeeList):
+        '''
+        Inserts the employees in a single transaction. If that transaction fails, each employee
+        is retried in its own so one bad profile doesn't lose the batch.
+        Returns the employees the database rejected. Raises if the database itself is unavailable
+        (connection lost, lock timeouts), since then no employee was at fault; the error's committed
+        and rejected attributes list the employees already inserted or rejected one by one before that.
+        '''
+        self.warmCaches()
+        self.checkUniqueKeys()
+
+        try:
+            self.__retryOnDeadlock__(self.__insertBatch__, employeeList)
+            return []
+        except (OperationalError, InterfaceError) as error:
+            error.committed, error.rejected = [], []
+            raise
+        except Exception as error:
+            if len(employeeList) == 1:
+                print(employeeList[0].user_url_id, "could not be inserted:", error)
+                return list(employeeList)
+
+        committed = []
+        failed = []
+        for employee in employeeList:
+            try:
+                self.__retryOnDeadlock__(self.__insertBatch__, [employee])
+                committed.append(employee)
+            except (OperationalError, InterfaceError) as error:
+                error.committed, error.rejected = committed, failed
+                raise
+            except Exception as error:
+                print(employee.user_url_id, "could not be inserted:", error)
+                failed.append(employee)
+
+        return failed
+
+    def __retryOnDeadlock__(self, write, *args):
+        ''' Runs a write transaction again when the database chose it as a deadlock victim '''
+        for attempt in range(DEADLOCK_RETRIES):
+            try:
+                return write(*args)
+            except Exception as error:
+                if not __isDeadlock__(error) or attempt == DEADLOCK_RETRIES - 1:
+                    raise
+                print("Deadlock, retrying the transaction")
+                time.sleep(0.1 * (attempt + 1))
+
+    def __insertBatch__(self, employeeList):
+        session = self.__connect__()
 
-                emp.skills.append(ski)
+        # Natural key -> id of every dimension row resolved in this transaction; only published
+        # to the caches once it commits
+        expList = {}
+        eduList = {}
+        skillList = {}
+        insertedURLs = []
+        try:
+            profiles = {}
+            for employee in employeeList:
+                emp, experiences, educations, skills = self.__extractTableTuples__(employee)
+                if emp.user_url in profiles:
+                    print(emp.user_url, "is a duplicate")
+                    continue
+                profiles[emp.user_url] = (emp, experiences, educations, skills)
+
+            # One query for the whole batch; compared case-insensitively like the MySQL collation
+            duplicates = {user_url.casefold() for user_url, in session.execute(
+                select(Employee.user_url).where(Employee.user_url.in_(list(profiles))))}
+            for user_url in [user_url for user_url in profiles if user_url.casefold() in duplicates]:
+                print(user_url, "is a duplicate")
+                del profiles[user_url]
+
+            if not profiles:
+                session.commit()
+                return
+
+            self.__resolveIds__(session, Experience, self.__experienceCache__, expList, EXPERIENCE_KEY,
+                                [(exp[0].position, exp[0].company_name)
+                                 for profile in profiles.values() for exp in profile[1]])
+            self.__resolveIds__(session, Education, self.__educationCache__, eduList, EDUCATION_KEY,
+                                [(edu[0].institution, edu[0].degree, edu[0].degree_type)
+                                 for profile in profiles.values() for edu in profile[2]])
+            self.__resolveIds__(session, Skill, self.__skillCache__, skillList, SKILL_KEY,
+                                [(skill.skill, skill.category) for profile in profiles.values() for skill in profile[3]])
+
+            session.execute(Employee.__table__.insert(), [__columnValues__(profile[0]) for profile in profiles.values()])
+            # The unique user_url of a profile inserted concurrently fails the insert above, and
+            # insertEmployees' per-employee retry then skips it as a duplicate
+            empIds = dict(session.execute(
+                select(Employee.user_url, Employee.id).where(Employee.user_url.in_(list(profiles)))).all())
+
+            # Keyed by primary key: a row listed twice on a profile is written once
+            experienceRows = {}
+            educationRows = {}
+            skillRows = set()
+            for user_url, (emp, experiences, educations, skills) in profiles.items():
+                empId = empIds[user_url]
+                for experience, employeeExperience in experiences:
+                    row = __columnValues__(employeeExperience)
+                    row.update(emp_id=empId, exp_id=expList[(experience.position, experience.company_name)])
+                    experienceRows[(empId, row['exp_id'], row['start_date'])] = row
+
+                for education, employeeEducation in educations:
+                    row = __columnValues__(employeeEducation)
+                    row.update(emp_id=empId,
+                               edu_id=eduList[(education.institution, education.degree, education.degree_type)])
+                    educationRows[(empId, row['edu_id'])] = row
+
+                for skill in skills:
+                    skillRows.add((empId, skillList[(skill.skill, skill.category)]))
+
+            if experienceRows:
+                session.execute(EmployeeExperience.__table__.insert(), list(experienceRows.values()))
+            if educationRows:
+                session.execute(EmployeeEducation.__table__.insert(), list(educationRows.values()))
+            if skillRows:
+                session.execute(employee_skill.insert(),
+                                [{'emp_id': empId, 'skill_id': skillId} for empId, skillId in skillRows])
+
+            # Staleness baseline of LinkedInRefresh: a new profile is as fresh as a just refreshed one.
+            # Without a fingerprint every section is still compared and written on its first refresh
+            now = datetime.now()
+            session.execute(ProfileFingerprint.__table__.insert(),
+                            [{'emp_id': empId, 'section': PROFILE, 'fingerprint': None, 'checked_at': now,
+                              'changed_at': now} for empId in empIds.values()])
 
-            session.add(emp)
             session.commit()
-        session.close()
+            insertedURLs = list(profiles)
+        except:
+            session.rollback()
+            # Nothing from the rolled back transaction may stay cached (including ids it trusted)
+            self.__experienceCache__.discard(expList)
+            self.__educationCache__.discard(eduList)
+            self.__skillCache__.discard(skillList)
+            raise
+        finally:
+            session.close()
+
+        if self.__employeeURLIndex__ is not None:
+            self.__employeeURLIndex__.update(insertedURLs)
+
+        # Write-through once the rows are durable
+        self.__experienceCache__.putAll(expList.items())
+        self.__educationCache__.putAll(eduList.items())
+        self.__skillCache__.putAll(skillList.items())
+
+    def __upsertStatement__(self, table, keyNames, rows):
+        ''' Multi-row INSERT (one of UPSERT_DIALECTS) that leaves the rows whose natural key exists alone '''
+        dialect = self.engine.dialect.name
+        if dialect == "mysql":
+            statement = mysqlInsert(table).values(rows)
+            # No-op update: the existing row and its id are kept, and unlike INSERT IGNORE other errors still raise
+            return statement.on_duplicate_key_update(id=table.c.id)
+        if dialect == "sqlite":
+            return sqliteInsert(table).values(rows).on_conflict_do_nothing(index_elements=list(keyNames))
+        return postgresqlInsert(table).values(rows).on_conflict_do_nothing(index_elements=list(keyNames))
+
+    def __resolveIds__(self, session, model, cache, pending, keyNames, keys):
+        '''
+        Resolves the ids of dimension rows by natural key into pending: transaction-local keys, then
+        the cache, then one upsert and one select per chunk of the keys still missing.
+        Concurrent writers of the same key converge on one row instead of failing on the unique constraint.
+        '''
+        table = model.__table__
+        keyColumns = [table.c[name] for name in keyNames]
+        upsertable = table.name in self.checkUniqueKeys()
+
+        missing = []
+        for key in dict.fromkeys(keys):
+            if key in pending:
+                continue
+            rowId = cache.get(key)
+            if rowId is not None:
+                pending[key] = rowId
+            elif upsertable and None not in key:
+                missing.append(key)
+            else:
+                # NULLs never conflict in a unique constraint, so these are read before written
+                self.__lookupId__(session, cache, pending, key, model(**dict(zip(keyNames, key))),
+                                  *[column == value for column, value in zip(keyColumns, key)])
+
+        # Every writer locks the keys in the same order, so concurrent upserts wait instead of deadlocking
+        missing.sort()
+        for start in range(0, len(missing), UPSERT_CHUNK_SIZE):
+            chunk = missing[start:start + UPSERT_CHUNK_SIZE]
+            session.execute(self.__upsertStatement__(table, keyNames, [dict(zip(keyNames, key)) for key in chunk]))
+
+            # Locking read: also sees rows other writers committed after this transaction's snapshot (MySQL)
+            found = {}
+            for row in session.execute(select(table.c.id, *keyColumns).
+                                       where(tuple_(*keyColumns).in_(chunk)).with_for_update(read=True)):
+                found[tuple(row[1:])] = row[0]
+
+            for key in chunk:
+                rowId = found.get(key)
+                if rowId is None:
+                    # Stored with another case or trailing spaces that the collation considers equal
+                    self.__lookupId__(session, cache, pending, key, model(**dict(zip(keyNames, key))),
+                                      *[column == value for column, value in zip(keyColumns, key)])
+                else:
+                    pending[key] = rowId
+
+    def staleProfiles(self, limit, checkedBefore):
+        '''
+        Returns up to limit (user_url, {section: fingerprint}) of the profiles last checked (or
+        inserted) before checkedBefore, stalest first. Profiles scraped before fingerprints were
+        recorded have no checked_at and come first.
+        '''
+        checkedAt = ProfileFingerprint.checked_at
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(Employee.id, Employee.user_url).
+                outerjoin(ProfileFingerprint, and_(ProfileFingerprint.emp_id == Employee.id,
+                                                   ProfileFingerprint.section == PROFILE)).
+                where(or_(checkedAt.is_(None), checkedAt < checkedBefore)).
+                order_by(checkedAt, Employee.id).limit(limit)).all()
+
+            fingerprints = {empId: {} for empId, _ in rows}
+            if rows:
+                for empId, section, fingerprint in connection.execute(
+                        select(ProfileFingerprint.emp_id, ProfileFingerprint.section, ProfileFingerprint.fingerprint).
+                        where(ProfileFingerprint.emp_id.in_(list(fingerprints)),
+                              ProfileFingerprint.fingerprint.isnot(None))):
+                    fingerprints[empId][section] = fingerprint
+
+        return [(user_url, fingerprints[empId]) for empId, user_url in rows]
+
+    def refreshEmployee(self, employee, fingerprints, changed):
+        '''
+        Applies a refreshed profile in one transaction. Only the sections in changed are written,
+        as the minimal diff against the rows already there; every section in fingerprints is
+        recorded as checked now. Returns the number of rows inserted, updated and deleted, or
+        None if the profile is not in the database.
+        '''
+        self.warmCaches()
+        self.checkUniqueKeys()
+        return self.__retryOnDeadlock__(self.__refreshEmployee__, employee, fingerprints, changed)
+
+    def __refreshEmployee__(self, employee, fingerprints, changed):
+        session = self.__connect__()
+        expList = {}
+        eduList = {}
+        skillList = {}
+        counts = {"inserted": 0, "updated": 0, "deleted": 0}
+        try:
+            emp, experiences, educations, skills = self.__extractTableTuples__(employee)
+            empRow = session.query(Employee).filter(Employee.user_url == emp.user_url).first()
+            if empRow is None:
+                print(emp.user_url, "is not in the database")
+                return None
+
+            if PROFILE in changed:
+                changedColumns = {column: value for column, value in employee.__toRow__().items()
+                                  if getattr(empRow, column) != value}
+                for column, value in changedColumns.items():
+                    setattr(empRow, column, value)
+                if changedColumns:
+                    counts["updated"] += 1
+
+            if EXPERIENCE in changed:
+                # Keyed by the primary key of employee_experience
+                self.__resolveIds__(session, Experience, self.__experienceCache__, expList, EXPERIENCE_KEY,
+                                    [(exp[0].position, exp[0].company_name) for exp in experiences])
+                wanted = {}
+                for exp in experiences:
+                    exp[1].exp_id = expList[(exp[0].position, exp[0].company_name)]
+                    wanted[(exp[1].exp_id, exp[1].start_date)] = exp[1]
+                self.__applyDiff__(session, empRow.id, wanted, session.query(EmployeeExperience).filter(
+                    EmployeeExperience.emp_id == empRow.id), lambda row: (row.exp_id, row.start_date),
+                    ('end_date', 'location', 'description', 'employment_type'), counts)
+
+            if EDUCATION in changed:
+                self.__resolveIds__(session, Education, self.__educationCache__, eduList, EDUCATION_KEY,
+                                    [(edu[0].institution, edu[0].degree, edu[0].degree_type) for edu in educations])
+                wanted = {}
+                for edu in educations:
+                    edu[1].edu_id = eduList[(edu[0].institution, edu[0].degree, edu[0].degree_type)]
+                    wanted[edu[1].edu_id] = edu[1]
+                self.__applyDiff__(session, empRow.id, wanted, session.query(EmployeeEducation).filter(
+                    EmployeeEducation.emp_id == empRow.id), lambda row: row.edu_id,
+                    ('start_date', 'end_date', 'GPA', 'activities', 'description'), counts)
+
+            if SKILLS in changed:
+                self.__resolveIds__(session, Skill, self.__skillCache__, skillList, SKILL_KEY,
+                                    [(skill.skill, skill.category) for skill in skills])
+                wanted = {skillList[(skill.skill, skill.category)] for skill in skills}
+                existing = {skillId for skillId, in session.execute(
+                    select(employee_skill.c.skill_id).where(employee_skill.c.emp_id == empRow.id))}
+
+                removed = existing - wanted
+                if removed:
+                    session.execute(delete(employee_skill).where(employee_skill.c.emp_id == empRow.id,
+                                                                 employee_skill.c.skill_id.in_(removed)))
+                added = wanted - existing
+                if added:
+                    session.execute(employee_skill.insert(),
+                                    [{'emp_id': empRow.id, 'skill_id': skillId} for skillId in added])
+                counts["deleted"] += len(removed)
+                counts["inserted"] += len(added)
+
+            self.__recordFingerprints__(session, empRow.id, fingerprints)
+            session.commit()
+        except:
+            session.rollback()
+            self.__experienceCache__.discard(expList)
+            self.__educationCache__.discard(eduList)
+            self.__skillCache__.discard(skillList)
+            raise
+        finally:
+            session.close()
+
+        self.__experienceCache__.putAll(expList.items())
+        self.__educationCache__.putAll(eduList.items())
+        self.__skillCache__.putAll(skillList.items())
+        return counts
+
+    def __applyDiff__(self, session, empId, wanted, existingRows, key, columns, counts):
+        ''' Deletes the association rows no longer on the profile, updates the changed ones and adds the new ones '''
+        for row in existingRows:
+            wantedRow = wanted.pop(key(row), None)
+            if wantedRow is None:
+                session.delete(row)
+                counts["deleted"] += 1
+                continue
+
+            changedColumns = [column for column in columns if getattr(row, column) != getattr(wantedRow, column)]
+            for column in changedColumns:
+                setattr(row, column, getattr(wantedRow, column))
+            if changedColumns:
+                counts["updated"] += 1
+
+        for wantedRow in wanted.values():
+            wantedRow.emp_id = empId
+            session.add(wantedRow)
+            counts["inserted"] += 1
+
+    def __recordFingerprints__(self, session, empId, fingerprints):
+        now = datetime.now()
+        # Unchanged sections only move their checked_at
+        session.execute(update(ProfileFingerprint).where(ProfileFingerprint.emp_id == empId).
+                        values(checked_at=now))
+
+        stored = {row.section: row for row in
+                  session.query(ProfileFingerprint).filter(ProfileFingerprint.emp_id == empId)}
+        for section, fingerprint in fingerprints.items():
+            row = stored.get(section)
+            if row is None:
+                session.add(ProfileFingerprint(emp_id=empId, section=section, fingerprint=fingerprint,
+                                               checked_at=now, changed_at=now))
+            elif row.fingerprint != fingerprint:
+                row.fingerprint = fingerprint
+                row.changed_at = now
 
     def __extractTableTuples__(self, employee):
         emp = self.__extractEmployeeTuple__(employee)
@@ -243,8 +740,7 @@ class LinkedInDB:
         return emp, exp, edu, skill
 
     def __extractEmployeeTuple__(self, employee):
-        return Employee(user_url=employee.user_url_id, name=employee.name,
-                        location=employee.location, header=employee.header, about=employee.about)
+        return Employee(**employee.__toRow__())
 
     def __extractExperienceTuples__(self, employee):
         exps = employee.experience
@@ -252,15 +748,11 @@ class LinkedInDB:
         tuples = []
         for exp in exps:
             # Appends a tuple of two tuples: First tuple for exp table, Second tuple for empexp table
-            experience = Experience(
-                position=exp.position, company_name=exp.company_name)
-            employeeExperience = EmployeeExperience(start_date=self.__castToDate__(exp.start_date),
-                                                    end_date=self.__castToDate__(
-                                                        exp.end_date),
-                                                    location=exp.location,
-                                                    description=exp.description,
-                                                    employment_type=exp.employment_type
-                                                    )
+            experienceRow, employeeExperienceRow = exp.__toRows__()
+            experience = Experience(**experienceRow)
+            employeeExperienceRow['start_date'] = ToDate(exp.start_date)
+            employeeExperienceRow['end_date'] = ToDate(exp.end_date)
+            employeeExperience = EmployeeExperience(**employeeExperienceRow)
             tuples.append((experience, employeeExperience))
 
         return tuples
@@ -271,15 +763,11 @@ class LinkedInDB:
         tuples = []
         for edu in edus:
             # Appends a tuple of two tuples: First tuple for edu table, Second tuple for empedu table
-            education = Education(
-                institution=edu.institution, degree=edu.degree, degree_type=edu.degree_type)
-            employeeEducation = EmployeeEducation(start_date=self.__castToDate__(edu.start_date),
-                                                  end_date=self.__castToDate__(
-                                                      edu.end_date),
-                                                  GPA=edu.GPA,
-                                                  activities=edu.activities,
-                                                  description=edu.description
-                                                  )
+            educationRow, employeeEducationRow = edu.__toRows__()
+            education = Education(**educationRow)
+            employeeEducationRow['start_date'] = ToDate(edu.start_date)
+            employeeEducationRow['end_date'] = ToDate(edu.end_date)
+            employeeEducation = EmployeeEducation(**employeeEducationRow)
             tuples.append((education, employeeEducation))
 
         return tuples
@@ -288,31 +776,10 @@ class LinkedInDB:
         if employee.skills is None:
             return []
 
-        skills = set()
+        # One row per canonical skill; the profile lists each one once
         tuples = []
-        for category in employee.skills:
-            for skill in employee.skills[category]:
-                if skill.lower() not in skills:
-                    skl = Skill(skill=skill, category=category)
-                    tuples.append(skl)
-                    skills.add(skill.lower())
+        for category, skills in self.skillNormalizer.normalize(employee.skills).items():
+            for skill in skills:
+                tuples.append(Skill(skill=skill, category=category))
 
         return tuples
-
-    def __castToDate__(self, dateStr: str) -> date:
-        if dateStr is None:
-            return None
-
-        if dateStr.__contains__('Present') or len(dateStr) == 0:
-            return None
-
-        dateCheck = dateStr.split()
-
-        if len(dateCheck) == 1:
-            # The formatting of the experiences in nested sublists sometimes makes it difficult to extract dates
-            # For now, we handle it by returning None, but there needs to be a work around somewhere within the scraper
-            d = datetime.strptime(dateStr, '%Y')
-        elif len(dateCheck) == 2:
-            d = datetime.strptime(dateStr, '%b %Y')
-
-        return d.date()
@@ -0,0 +1,276 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import sqlalchemy
+from sqlalchemy import event
+
+from Employee import Employee
+from Experience import Experience
+from Education import Education
+from LinkedInDBAccess import LinkedInDB, Base
+
+"""
+LinkedInDBBenchmark
+
+Description:
+    Measures how LinkedInDB.insertEmployees scales as the tables grow.
+    Generates synthetic Employee/Experience/Education/skills objects with realistic cardinalities
+    (few distinct companies, schools and skills shared by many profiles, Zipf-like popularity)
+    and inserts them through the real LinkedInDB code.
+    Reports rows/sec, SQL statements per profile and p50/p99 per-profile latency, and saves the
+    results as JSON so regressions show up between versions: each run goes to its own timestamped
+    file in bench_results/ and is compared with the committed reference run (bench_reference.json,
+    the default sizes on a temporary SQLite file). Refresh the reference with --output bench_reference.json.
+
+Usage:
+    python LinkedInDBBenchmark.py [--url URL --allow-drop] [--sizes 1000 10000 100000] [--output FILE]
+                                  [--reference FILE]
+"""
+
+BENCHMARK_SIZES = (1000, 10000, 100000)
+BENCHMARK_OUTPUT_DIRECTORY = "bench_results"
+BENCHMARK_REFERENCE = "bench_reference.json"
+
+# Distinct values of each dimension seen across profiles
+COMPANY_COUNT = 2000
+POSITION_COUNT = 400
+INSTITUTION_COUNT = 1500
+DEGREE_COUNT = 150
+SKILL_COUNT = 5000
+
+DEGREE_TYPES = ["Bachelor of Science - BS", "Master of Science - MS", "Bachelor of Arts - BA",
+                "Master of Business Administration - MBA", "Doctor of Philosophy - PhD", "Associate's degree"]
+SKILL_CATEGORIES = ["Industry Knowledge", "Tools & Technologies", "Interpersonal Skills", "Languages",
+                    "Other Skills"]
+EMPLOYMENT_TYPES = ["Full-time", "Part-time", "Internship", "Contract", ""]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Items per profile: (min, max)
+EXPERIENCES_PER_PROFILE = (1, 6)
+EDUCATIONS_PER_PROFILE = (1, 3)
+SKILLS_PER_PROFILE = (5, 40)
+
+
+class EmployeeGenerator:
+    ''' Deterministic (seeded) generator of scraper-side Employee objects '''
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.companies = [f"Company {i}" for i in range(COMPANY_COUNT)]
+        self.positions = [f"Position {i}" for i in range(POSITION_COUNT)]
+        self.institutions = [f"University {i}" for i in range(INSTITUTION_COUNT)]
+        self.degrees = [f"Degree {i}" for i in range(DEGREE_COUNT)]
+        self.skills = [f"Skill {i}" for i in range(SKILL_COUNT)]
+        self.skillCategories = [self.random.choice(SKILL_CATEGORIES) for _ in range(SKILL_COUNT)]
+        self.__weights__ = {}
+
+    def __pick__(self, values, count=1):
+        # Popularity follows a Zipf-like distribution: a few values are shared by many profiles
+        cumulativeWeights = self.__weights__.get(len(values))
+        if cumulativeWeights is None:
+            cumulativeWeights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(values))))
+            self.__weights__[len(values)] = cumulativeWeights
+        return self.random.choices(range(len(values)), cum_weights=cumulativeWeights, k=count)
+
+    def __date__(self):
+        return f"{self.random.choice(MONTHS)} {self.random.randint(1995, 2022)}"
+
+    def employee(self, i):
+        emp = Employee()
+        emp.user_url_id = f"benchmark-profile-{i}"
+        emp.name = f"Employee {i}"
+        emp.location = "Seattle, WA"
+        emp.header = "Software Engineer"
+        emp.about = "About " * self.random.randint(0, 50)
+
+        emp.experience = []
+        for index in set(self.__pick__(self.positions, self.random.randint(*EXPERIENCES_PER_PROFILE))):
+            exp = Experience()
+            exp.position = self.positions[index]
+            exp.company_name = self.companies[self.__pick__(self.companies)[0]]
+            exp.employment_type = self.random.choice(EMPLOYMENT_TYPES)
+            exp.location = "Seattle, WA"
+            exp.description = "Description " * self.random.randint(0, 30)
+            exp.start_date = self.__date__()
+            exp.end_date = self.random.choice([self.__date__(), "Present"])
+            emp.experience.append(exp)
+
+        emp.education = []
+        # A profile lists a school once (employee_education is keyed by employee and education)
+        for index in set(self.__pick__(self.institutions, self.random.randint(*EDUCATIONS_PER_PROFILE))):
+            edu = Education()
+            edu.institution = self.institutions[index]
+            edu.degree = self.degrees[self.__pick__(self.degrees)[0]]
+            edu.degree_type = self.random.choice(DEGREE_TYPES)
+            edu.start_date = str(self.random.randint(1995, 2018))
+            edu.end_date = str(self.random.randint(2019, 2026))
+            emp.education.append(edu)
+
+        emp.skills = {}
+        for index in set(self.__pick__(self.skills, self.random.randint(*SKILLS_PER_PROFILE))):
+            emp.skills.setdefault(self.skillCategories[index], []).append(self.skills[index])
+
+        return emp.compact()
+
+
+def __percentile__(sortedValues, percent):
+    if not sortedValues:
+        return 0.0
+    index = min(int(round(percent / 100.0 * (len(sortedValues) - 1))), len(sortedValues) - 1)
+    return sortedValues[index]
+
+
+def RunBenchmark(url, size, batchSize=1, seed=0):
+    ''' Inserts size synthetic profiles into an empty database at url; returns the measurements '''
+    database = LinkedInDB("benchmark", None, None, None, None, url=url)
+    Base.metadata.drop_all(database.engine)
+    database.__createTables__()
+
+    statements = [0]
+
+    def countStatement(*args):
+        statements[0] += 1
+
+    event.listen(database.engine, "before_cursor_execute", countStatement)
+
+    generator = EmployeeGenerator(seed)
+    latencies = []
+    rows = 0
+    elapsed = 0.0
+    for start in range(0, size, batchSize):
+        batch = [generator.employee(i) for i in range(start, min(start + batchSize, size))]
+        for emp in batch:
+            skillCount = sum(len(skills) for skills in emp.skills.values())
+            # employees + associations; new dimension rows are a small, shrinking fraction
+            rows += 1 + len(emp.experience) + len(emp.education) + skillCount
+
+        began = time.perf_counter()
+        database.insertEmployees(batch)
+        took = time.perf_counter() - began
+
+        elapsed += took
+        latencies.append(took / len(batch))
+
+    event.remove(database.engine, "before_cursor_execute", countStatement)
+    database.engine.dispose()
+
+    latencies.sort()
+    return {
+        "profiles": size,
+        "batch_size": batchSize,
+        "seconds": round(elapsed, 3),
+        "profiles_per_second": round(size / elapsed, 1),
+        "rows_per_second": round(rows / elapsed, 1),
+        "statements_per_profile": round(statements[0] / size, 2),
+        "p50_ms": round(__percentile__(latencies, 50) * 1000, 3),
+        "p99_ms": round(__percentile__(latencies, 99) * 1000, 3),
+    }
+
+
+def MeasureMemory(size, seed=0):
+    ''' Bytes held by size profiles before and after Employee.compact() '''
+    generator = EmployeeGenerator(seed)
+    # Round trip through JSON so that every string is a distinct object, as when scraped
+    documents = [generator.employee(i).__toJSON__() for i in range(size)]
+
+    tracemalloc.start()
+    employees = [Employee.__fromDict__(json.loads(document)) for document in documents]
+    loose = tracemalloc.get_traced_memory()[0]
+    for emp in employees:
+        emp.compact()
+    compact = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {
+        "profiles": size,
+        "loose_bytes": loose,
+        "compact_bytes": compact,
+        "compact_bytes_per_profile": round(compact / size, 1),
+    }
+
+
+def __gitRevision__():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+# Driver Code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark LinkedInDB.insertEmployees")
+    parser.add_argument("--url", help="SQLAlchemy URL (default: a temporary SQLite file per size)")
+    parser.add_argument("--allow-drop", action="store_true",
+                        help="Required with --url: the benchmark drops and recreates every table")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES))
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help=f"Results file (default: a timestamped file in {BENCHMARK_OUTPUT_DIRECTORY}/)")
+    parser.add_argument("--reference", default=BENCHMARK_REFERENCE, help="Results the run is compared with")
+    parser.add_argument("--memory", action="store_true",
+                        help="Only measure the memory held by the in-memory profiles of each size")
+    args = parser.parse_args()
+
+    if args.memory:
+        for size in args.sizes:
+            result = MeasureMemory(size, args.seed)
+            print(f"{size:>7} profiles: {result['loose_bytes'] / 2 ** 20:.1f} MiB loose, "
+                  f"{result['compact_bytes'] / 2 ** 20:.1f} MiB compact "
+                  f"({result['compact_bytes_per_profile']} bytes/profile)")
+        sys.exit(0)
+
+    if args.url and not args.allow_drop:
+        parser.error("--url drops every LinkedInDB table, pass --allow-drop to confirm")
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            url = args.url or f"sqlite:///{os.path.join(directory, f'benchmark{size}.db')}"
+            result = RunBenchmark(url, size, args.batch_size, args.seed)
+            results.append(result)
+            print(f"{size:>7} profiles: {result['rows_per_second']:>9} rows/s  "
+                  f"{result['statements_per_profile']:>6} statements/profile  "
+                  f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms")
+
+    report = {
+        "revision": __gitRevision__(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "engine": (args.url or "sqlite").split(":", 1)[0],
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "results": results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(BENCHMARK_OUTPUT_DIRECTORY, exist_ok=True)
+        output = os.path.join(BENCHMARK_OUTPUT_DIRECTORY, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as file:
+        json.dump(report, file, indent=4)
+    print("Results saved to", output)
+
+    try:
+        with open(args.reference, "r") as file:
+            reference = json.load(file)
+    except FileNotFoundError:
+        reference = None
+
+    if reference is not None and os.path.abspath(args.reference) != os.path.abspath(output):
+        print("Compared with", args.reference, f"({reference['engine']}, revision {reference['revision']}):")
+        referenceResults = {(result["profiles"], result["batch_size"]): result for result in reference["results"]}
+        for result in results:
+            baseline = referenceResults.get((result["profiles"], result["batch_size"]))
+            if baseline is not None:
+                print(f"{result['profiles']:>7} profiles: "
+                      f"{result['rows_per_second'] / baseline['rows_per_second']:>6.2f}x rows/s  "
+                      f"{result['statements_per_profile'] - baseline['statements_per_profile']:>+6.2f} statements/profile  "
+                      f"p99 {result['p99_ms'] / baseline['p99_ms']:.2f}x")
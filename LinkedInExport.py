@@ -0,0 +1,298 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+
+from sqlalchemy import select, and_, or_, Integer, Date, DateTime
+
+from LinkedInDBAccess import LinkedInDB, Employee, Experience, Education, Skill, EmployeeExperience, \
+    EmployeeEducation, employee_skill
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+"""
+LinkedInExport
+
+Description:
+    Reads the scraped dataset out of the database in fixed-size chunks and writes every table, plus
+    a denormalized per-employee view (profiles: one row per employee with its experiences,
+    educations and skills nested), as Parquet (pyarrow) or JSONL files.
+    Chunks are read by keyset pagination (WHERE key > last key ORDER BY key LIMIT chunk), one query
+    per chunk, so memory stays constant on every driver, including buffered ones like
+    mysqlconnector. Each chunk is written (one Parquet row group / a block of JSONL lines) before the
+    next one is read, and the profiles view resolves a chunk of employees with one query per
+    association table instead of one per employee.
+
+    Every run writes <directory>/<table>/<run>.<format> and records the highest id exported per
+    table in <directory>/exportState.json. With --incremental only rows above those high-water marks
+    are exported. Association rows are keyed by emp_id, so rows added later to an employee that was
+    already exported are only picked up by a full export.
+
+Usage:
+    python LinkedInExport.py [--url URL] [--directory export] [--format parquet|jsonl] [--incremental]
+"""
+
+EXPORT_DIRECTORY = "export"
+EXPORT_CHUNK_SIZE = 10000
+EXPORT_STATE_FILE = "exportState.json"
+
+PARQUET = "parquet"
+JSONL = "jsonl"
+
+PROFILES = "profiles"
+# Exported as they are, keyed by their id (or emp_id for the association tables)
+EXPORT_TABLES = [Employee.__table__, Experience.__table__, Education.__table__, Skill.__table__,
+                 EmployeeExperience.__table__, EmployeeEducation.__table__, employee_skill]
+
+# Nested in each profile
+EXPERIENCE_COLUMNS = [Experience.__table__.c.position, Experience.__table__.c.company_name,
+                      EmployeeExperience.__table__.c.employment_type, EmployeeExperience.__table__.c.location,
+                      EmployeeExperience.__table__.c.description, EmployeeExperience.__table__.c.start_date,
+                      EmployeeExperience.__table__.c.end_date]
+EDUCATION_COLUMNS = [Education.__table__.c.institution, Education.__table__.c.degree,
+                     Education.__table__.c.degree_type, EmployeeEducation.__table__.c.GPA,
+                     EmployeeEducation.__table__.c.activities, EmployeeEducation.__table__.c.description,
+                     EmployeeEducation.__table__.c.start_date, EmployeeEducation.__table__.c.end_date]
+SKILL_COLUMNS = [Skill.__table__.c.skill, Skill.__table__.c.category]
+
+
+def __keyColumn__(table):
+    return table.c.id if "id" in table.c else table.c.emp_id
+
+
+def __arrowType__(column):
+    if isinstance(column.type, Integer):
+        return pyarrow.int64()
+    if isinstance(column.type, DateTime):
+        return pyarrow.timestamp("us")
+    if isinstance(column.type, Date):
+        return pyarrow.date32()
+    return pyarrow.string()
+
+
+def __arrowStruct__(columns):
+    return pyarrow.struct([(column.name, __arrowType__(column)) for column in columns])
+
+
+def __profileSchema__():
+    return pyarrow.schema([(column.name, __arrowType__(column)) for column in Employee.__table__.columns] + [
+        ("experiences", pyarrow.list_(__arrowStruct__(EXPERIENCE_COLUMNS))),
+        ("educations", pyarrow.list_(__arrowStruct__(EDUCATION_COLUMNS))),
+        ("skills", pyarrow.list_(__arrowStruct__(SKILL_COLUMNS))),
+    ])
+
+
+def __jsonValue__(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class JSONLWriter:
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.__file__ = open(path, "w")
+
+    def write(self, rows):
+        self.__file__.write("".join(json.dumps(row, default=__jsonValue__) + "\n" for row in rows))
+
+    def close(self):
+        self.__file__.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self.__writer__ = pyarrow.parquet.ParquetWriter(path, schema)
+
+    def write(self, rows):
+        # One row group per chunk
+        self.__writer__.write_table(pyarrow.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.__writer__.close()
+
+
+class ChunkSink:
+    ''' Opens the output file on the first chunk, so runs without new rows leave no empty files '''
+
+    def __init__(self, directory, name, run, exportFormat, schema=None):
+        self.path = os.path.join(directory, name, f"{run}.{exportFormat}")
+        self.exportFormat = exportFormat
+        self.schema = schema
+        self.rows = 0
+        self.__writer__ = None
+
+    def write(self, rows):
+        if self.__writer__ is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            writerClass = ParquetWriter if self.exportFormat == PARQUET else JSONLWriter
+            self.__writer__ = writerClass(self.path, self.schema)
+        self.__writer__.write(rows)
+        self.rows += len(rows)
+
+    def close(self):
+        if self.__writer__ is not None:
+            self.__writer__.close()
+
+
+def __after__(columns, values):
+    ''' Rows whose (columns) sort after values: the keyset condition of a composite primary key '''
+    conditions = []
+    for i, column in enumerate(columns):
+        conditions.append(and_(*[columns[j] == values[j] for j in range(i)], column > values[i]))
+    return or_(*conditions)
+
+
+def StreamTable(connection, table, afterId=0, chunkSize=EXPORT_CHUNK_SIZE):
+    ''' Yields the rows of table with a key above afterId as lists of dicts, in primary key order '''
+    key = __keyColumn__(table)
+    primaryKey = list(table.primary_key.columns)
+    query = select(table).where(key > afterId).order_by(*primaryKey).limit(chunkSize)
+
+    last = None
+    while True:
+        rows = connection.execute(query if last is None else query.where(__after__(primaryKey, last))).all()
+        if not rows:
+            return
+
+        yield [dict(row._mapping) for row in rows]
+        last = [rows[-1]._mapping[column] for column in primaryKey]
+
+
+def StreamProfiles(connection, afterId=0, chunkSize=EXPORT_CHUNK_SIZE):
+    ''' Yields employees with an id above afterId, with their experiences, educations and skills nested '''
+    employees = Employee.__table__
+
+    while True:
+        partition = connection.execute(
+            select(employees).where(employees.c.id > afterId).order_by(employees.c.id).limit(chunkSize)).all()
+        if not partition:
+            return
+        afterId = partition[-1].id
+
+        profiles = {}
+        for row in partition:
+            profiles[row.id] = dict(row._mapping, experiences=[], educations=[], skills=[])
+        first, last = partition[0].id, partition[-1].id
+
+        employeeExperience = EmployeeExperience.__table__
+        for row in connection.execute(
+                select(employeeExperience.c.emp_id, *EXPERIENCE_COLUMNS).
+                join(Experience.__table__, Experience.__table__.c.id == employeeExperience.c.exp_id).
+                where(employeeExperience.c.emp_id.between(first, last)).
+                order_by(employeeExperience.c.emp_id, employeeExperience.c.start_date)):
+            profiles[row.emp_id]["experiences"].append({column.name: row[column.name] for column in EXPERIENCE_COLUMNS})
+
+        employeeEducation = EmployeeEducation.__table__
+        for row in connection.execute(
+                select(employeeEducation.c.emp_id, *EDUCATION_COLUMNS).
+                join(Education.__table__, Education.__table__.c.id == employeeEducation.c.edu_id).
+                where(employeeEducation.c.emp_id.between(first, last)).
+                order_by(employeeEducation.c.emp_id, employeeEducation.c.start_date)):
+            profiles[row.emp_id]["educations"].append({column.name: row[column.name] for column in EDUCATION_COLUMNS})
+
+        for row in connection.execute(
+                select(employee_skill.c.emp_id, *SKILL_COLUMNS).
+                join(Skill.__table__, Skill.__table__.c.id == employee_skill.c.skill_id).
+                where(employee_skill.c.emp_id.between(first, last)).
+                order_by(employee_skill.c.emp_id, employee_skill.c.skill_id)):
+            profiles[row.emp_id]["skills"].append({column.name: row[column.name] for column in SKILL_COLUMNS})
+
+        yield list(profiles.values())
+
+
+def __loadState__(directory):
+    try:
+        with open(os.path.join(directory, EXPORT_STATE_FILE), "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def ExportDataset(database: LinkedInDB, directory=EXPORT_DIRECTORY, exportFormat=None, chunkSize=EXPORT_CHUNK_SIZE,
+                  incremental=False):
+    ''' Exports every table and the profiles view; returns name -> rows exported '''
+    if exportFormat is None:
+        exportFormat = PARQUET if pyarrow is not None else JSONL
+    if exportFormat == PARQUET and pyarrow is None:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow), or use --format jsonl")
+
+    state = __loadState__(directory)
+    # High-water marks of this run, recorded only once every file was written
+    newState = dict(state)
+    run = time.strftime("%Y%m%dT%H%M%S")
+    exported = {}
+
+    with database.engine.connect() as connection:
+        for table in EXPORT_TABLES:
+            afterId = state.get(table.name, 0) if incremental else 0
+            schema = None
+            if exportFormat == PARQUET:
+                schema = pyarrow.schema([(column.name, __arrowType__(column)) for column in table.columns])
+
+            sink = ChunkSink(directory, table.name, run, exportFormat, schema)
+            try:
+                for rows in StreamTable(connection, table, afterId, chunkSize):
+                    sink.write(rows)
+                    afterId = max(afterId, max(row[__keyColumn__(table).name] for row in rows))
+            finally:
+                sink.close()
+
+            newState[table.name] = afterId
+            exported[table.name] = sink.rows
+            print(f"{table.name}: {sink.rows} rows")
+
+        afterId = state.get(PROFILES, 0) if incremental else 0
+        sink = ChunkSink(directory, PROFILES, run, exportFormat,
+                         __profileSchema__() if exportFormat == PARQUET else None)
+        try:
+            for profiles in StreamProfiles(connection, afterId, chunkSize):
+                sink.write(profiles)
+                afterId = profiles[-1]["id"]
+        finally:
+            sink.close()
+
+        newState[PROFILES] = afterId
+        exported[PROFILES] = sink.rows
+        print(f"{PROFILES}: {sink.rows} rows")
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, EXPORT_STATE_FILE), "w") as file:
+        json.dump(newState, file, indent=4)
+
+    return exported
+
+
+# Driver Code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the scraped dataset to Parquet or JSONL")
+    parser.add_argument("--url", help="SQLAlchemy URL (default: the scraper's database)")
+    parser.add_argument("--directory", default=EXPORT_DIRECTORY)
+    parser.add_argument("--format", choices=[PARQUET, JSONL],
+                        help="Default: parquet if pyarrow is installed, jsonl otherwise")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only export rows above the high-water marks of the previous run")
+    args = parser.parse_args()
+
+    if args.url is not None:
+        database = LinkedInDB("export", None, None, None, None, url=args.url)
+    else:
+        from ScraperConfig import CONFIG
+        database = CONFIG.database()
+
+    began = time.perf_counter()
+    try:
+        ExportDataset(database, args.directory, args.format, args.chunk_size, args.incremental)
+    except ImportError as error:
+        print("ERROR:", error)
+        sys.exit(1)
+    print(f"Exported to {args.directory} in {time.perf_counter() - began:.1f} s")
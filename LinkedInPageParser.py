@@ -0,0 +1,327 @@
+import hashlib
+
+from lxml import html as lxmlHTML
+
+from Employee import Employee
+from Experience import Experience
+from Education import Education
+from DateRangeParser import ParseDateRange, HasDuration
+
+"""
+LinkedInPageParser
+
+Description:
+    Parses snapshots (page_source) of the profile detail sections in-process.
+    Mirrors the XPaths used by the live-DOM extraction in LinkedInScraper, but pays for
+    a single WebDriver round trip per section instead of one per element lookup.
+    Returns the same Employee/Experience/Education/skills structures as the live path.
+"""
+
+
+def __document__(pageSource):
+    return lxmlHTML.fromstring(pageSource)
+
+
+def __first__(element, xpath):
+    # Equivalent of find_element: first match in document order, or None instead of NoSuchElementException
+    if element is None:
+        return None
+    matches = element.xpath(xpath)
+    if matches:
+        return matches[0]
+    return None
+
+
+def __text__(element, xpath):
+    match = __first__(element, xpath)
+    if match is None:
+        return None
+    return match.text_content().strip()
+
+
+def ParseEmployeeProfile(pageSource, employeeURL):
+    ''' Parses the top card of a profile page into an Employee without its detail sections '''
+    # Contains all relevant profile attributes
+    main = __first__(__document__(pageSource), "//main")
+    if main is None:
+        print("ERROR: Could not find <main>")
+        return None
+
+    currentEmployee = Employee()
+
+    # Last split in employeeURL
+    currentEmployee.user_url_id = employeeURL.split("/")[-1]
+
+    currentEmployee.name = __text__(main, "./section[1]/div[2]/div[2]/div[1]/div[1]/h1") or ""
+    currentEmployee.location = __text__(main, "./section[1]/div[2]/div[2]/div[2]/span[1]") or ""
+    currentEmployee.header = __text__(main, "./section[1]/div[2]/div[2]/div[1]/div[2]") or ""
+    currentEmployee.about = __text__(main, "./div/div/div[5]/section/div") or ""
+
+    return currentEmployee
+
+
+def ParseEmployeeExperiences(pageSource):
+    experiences = []
+
+    # All information contained within <main>
+    expSection = __first__(__document__(pageSource), "//main")
+    if expSection is None:
+        return None
+
+    # Extracting Top-level <li> tags from Experience Section
+    ul = __first__(expSection, "./section/div[2]/div/div[1]/ul")
+    if ul is None:
+        print("ERROR: Could not find experience list (1)")
+        return None
+
+    for exp in ul.xpath("./li"):
+        # Check for type
+        expSublist = None
+        # This can trigger for elements with descriptions
+        # (Single elements store their descriptions at the same location)
+        ul2 = __first__(__first__(exp, ".//ul"), ".//ul")
+        # Test to see if subList
+        if __first__(ul2, "./li[1]/span") is not None:
+            expSublist = ul2.xpath("./li")
+
+        # List of Elements
+        if expSublist:
+            company = __text__(exp, "./div/div[2]/div[1]/a/div/span/span[1]")
+            if company is None:
+                print("ERROR: Could not find company [1]")
+                print("Element that caused the error:")
+                print(exp.text_content().strip())
+                return None
+
+            # If this field is found, it applies to all subExp elements
+            # Comes in the format <Full-time · 7 mos>
+            jobType = __text__(exp, "./div/div[2]/div[1]/a/span[1]/span[1]")
+            jobType = jobType.split()[0] if jobType else ""
+
+            location = __text__(exp, "./div/div[2]/div[1]/a/span[2]/span[1]") or ""
+
+            for subExp in expSublist:
+                experience = Experience()
+
+                experience.company_name = company
+                # Position
+                experience.position = __text__(subExp, "./div/div[2]/div/a/div/span/span[1]")
+                if experience.position is None:
+                    print("ERROR: Could not find position [1]")
+                    return None
+
+                # Type (Optional)
+                if jobType != "":
+                    experience.employment_type = jobType
+                else:
+                    experience.employment_type = __text__(
+                        subExp, "./div/div/div[1]/ul/li[1]/div/div[2]/div/a/span[1]") or ""
+
+                # Location (Optional)
+                if location != "":
+                    experience.location = location
+                else:
+                    experience.location = __text__(subExp, "./div/div[2]/div/a/span[3]/span[1]") or ""
+
+                # Dates
+                dates = ""
+                for XPathLocation in ("./div/div[2]/div/a/span/span[1]",
+                                      "./div/div[2]/div[1]/a/span[2]/span[1]",
+                                      "./div/div[2]/div[1]/a/span[1]/span[1]"):
+                    dates = __text__(subExp, XPathLocation) or dates
+                    if HasDuration(dates):
+                        break
+                if not HasDuration(dates):
+                    print("ERROR: Could not find valid date")
+                    print("Here is the experience element that caused the problem:")
+                    print(experience.position + " at " + experience.company_name)
+                    return None
+
+                experience.start_date, experience.end_date, _ = ParseDateRange(dates)
+
+                experience.description = None
+                experience.media = None
+
+                experiences.append(experience)
+
+        # Single Element
+        else:
+            experience = Experience()
+
+            # Position
+            experience.position = __text__(exp, "./div/div/div[2]/div/div[1]/div/span/span[1]")
+            if experience.position is None:
+                print("ERROR: Could not find position [2]")
+                print("Element that caused error:")
+                print(exp.text_content().strip())
+                return None
+
+            # Company and Type
+            companyAndType = __text__(exp, "./div/div/div[2]/div/div[1]/span[1]/span[1]")
+            if companyAndType is None:
+                print("ERROR: Could not find company [3]")
+                return None
+            try:
+                dotInd = companyAndType.rindex('·')
+                experience.company_name = companyAndType[:dotInd].strip()
+                experience.employment_type = companyAndType[dotInd + 1:].strip()
+            except ValueError:
+                experience.company_name = companyAndType
+
+            # Location (Optional)
+            experience.location = __text__(exp, "./div/div/div[2]/div/div[1]/span[3]/span[1]") or ""
+
+            # Dates
+            dates = __text__(exp, "./div/div/div[2]/div/div[1]/span[2]/span[1]")
+            if dates is not None:
+                experience.start_date, experience.end_date, _ = ParseDateRange(dates)
+
+            # Description (Optional)
+            experience.description = __text__(
+                exp, "./div/div/div[2]/div[2]/ul/li/div/ul/li/div/div/div/span[1]") or ""
+
+            experience.media = None
+
+            experiences.append(experience)
+
+    return experiences
+
+
+def ParseEmployeeEducation(pageSource):
+    education = []
+
+    main = __first__(__document__(pageSource), "//main")
+    if main is None:
+        print("Could not find main")
+        return None
+
+    educationUL = __first__(main, ".//ul")
+    if educationUL is None:
+        print("Could not find education list <ul>")
+        return None
+
+    for educationElem in educationUL.xpath("./li"):
+        edu = Education()
+
+        degreeLine = __text__(educationElem, "./div/div/div[2]/div[1]/a/div/span[1]/span[1]")
+        if degreeLine is not None:
+            degreeArr = degreeLine.split(", ")
+            edu.degree = degreeArr[0]
+            edu.degree_type = degreeArr[-1]
+        else:
+            print("Could not find degree information")
+
+        edu.institution = __text__(educationElem, "./div/div/div[2]/div[1]/a/div/span/span[1]") or ""
+
+        ul = __first__(educationElem, ".//ul")
+        if ul is None:
+            print("Could not find description list")
+            descList = []
+        else:
+            descList = ul.xpath("./*")
+
+        for elem in descList:
+            string = elem.text_content().strip()
+            grade = "Grade:"
+            pos = string.find(grade)
+            if pos != -1:
+                # For eliminating duplicates (some fields are stored twice in the HTML, sometimes hidden)
+                start = pos + 1 + len(grade)
+                pos2 = string[start:].find(grade)
+                if pos2 != 1:
+                    edu.GPA = string[start:start + pos2].strip()
+                else:
+                    edu.GPA = string[start:].strip()
+                continue
+
+            activities = "Activities and societies:"
+            pos = string.find(activities)
+            if pos != -1:
+                start = pos + 1 + len(activities)
+                pos2 = string[start:].find(activities)
+                if pos2 != -1:
+                    edu.activities = string[start: start + pos2].strip()
+                else:
+                    edu.activities = string[start:].strip()
+                continue
+
+            # May require additional logic if repeated
+            edu.description = __text__(elem, "./div/ul/li/div/div/div/span[1]") or ""
+
+        edu.media = None
+
+        dates = __text__(educationElem, "./div/div/div[2]/div[1]/a/span[2]/span[1]")
+        if dates is not None:
+            # A single year is both the start and the end
+            edu.start_date, edu.end_date, _ = ParseDateRange(dates)
+            edu.end_date = edu.end_date or edu.start_date
+        else:
+            edu.start_date = ""
+            edu.end_date = ""
+
+        education.append(edu)
+
+    return education
+
+
+def ParseEmployeeSkills(pageSource):
+    '''
+    Expects a snapshot taken after every category button was clicked, so that
+    every category list has been rendered into the DOM
+    '''
+    skills = {}
+
+    main = __first__(__document__(pageSource), "//main")
+    if main is None:
+        print("Could not find main")
+        return None
+
+    buttonParent = __first__(main, "./section/div[2]/div[1]")
+    if buttonParent is None:
+        print("Could not find buttons [1]")
+        return {}
+
+    buttons = buttonParent.xpath("./button")
+
+    # Iterate through skills categories (skip first "All" button if more than one button)
+    if len(buttons) > 1:
+        buttons = buttons[1:]
+
+    for i, button in enumerate(buttons):
+        skillCategory = button.text_content().strip()
+        skills[skillCategory] = []
+
+        categoryListParent = __first__(main, f"./section/div[2]/div[{3 + i}]/div/div/div[1]/ul")
+        if categoryListParent is None:
+            print("Could not extract skill category list")
+            continue
+
+        # Iterate through individual skills within category
+        for skillElem in categoryListParent.xpath("./li"):
+            skill = __text__(skillElem, "./div/div/div[2]/div[1]/a/div/span[1]/span[1]")
+            if skill is None:
+                # Skill may not have a link (<a> element)
+                skill = __text__(skillElem, "./div/div/div[2]/div[1]/div[1]/div/span/span[1]")
+            if skill is None:
+                print("ERROR: Skill within category not found")
+                return None
+            skills[skillCategory].append(skill)
+
+    return skills
+
+
+def HasElement(pageSource, xpath):
+    ''' True if the snapshot contains an element matching xpath (e.g. a server-rendered list) '''
+    return __first__(__document__(pageSource), xpath) is not None
+
+
+def SectionFingerprint(pageSource):
+    '''
+    Content hash of a section snapshot: SHA-256 of the whitespace-normalized text of <main>,
+    so markup, scripts and tracking attributes that change on every load don't change it.
+    Returns None if the page has no <main>.
+    '''
+    main = __first__(__document__(pageSource), "//main")
+    if main is None:
+        return None
+    return hashlib.sha256(" ".join(main.text_content().split()).encode("utf-8")).hexdigest()
@@ -1,78 +1,233 @@
-from LinkedInScraper import LinkedInScraper, \
-    DATABASE, USERNAME, PASSWORD, DRIVER_PATH, \
-    WriteLinesToFile, ReadLinesFromFile
+from LinkedInScraper import LinkedInScraper
+from ScraperConfig import CONFIG
+from LinkedInDBAccess import LinkedInDB
+from PageArchive import PageArchive
+from PersistPipeline import PersistPipeline
+from RateController import RateController
+from SessionStore import SessionStore
+from ScraperMetrics import METRICS, InstrumentScraper, ExportMetrics
+from WorkQueue import WorkQueue, WORK_QUEUE_PATH, EMPLOYEE_URL_QUEUE
 
+import queue
 import schedule
+import sys
+import threading
 import time
 
 # Set Timeline to activate scraper
-# Scrape profiles from employeeURLs.txt until the list ends or LinkedIn blocks scraper
+# Scrape profiles from the employee URL queue until it is empty or LinkedIn blocks scraper
+# (Run WorkQueue.py once to import an existing employeeURLs.txt)
 
+# If scraping has failed this many times in a row for a worker, that worker stops
+# This is to account for blocked scraping
+# This makes an assumption that 5 broken URLs in a row is unlikely
+MAX_FAILED_SCRAPES = 5
 
-def scrapeProfiles():
-    driver = LinkedInScraper(USERNAME, PASSWORD, DRIVER_PATH, DATABASE)
+# If a URL has failed this many times, it is marked as failed (doesn't account for blocked scraping,
+# but losing one datapoint is ok)
+MAX_URL_ATTEMPTS = 2
 
-    previousFail = ""
+# A URL whose page looked like a soft block is retried (at the back of the queue) this many times
+# A page without <main> may just be a deleted profile, so these attempts are counted too
+MAX_BLOCK_ATTEMPTS = 4
+
+# Soft blocks on this many different URLs in a row confirm that the account is blocked, and the
+# URL goes back to the front of the queue without counting the attempt
+BLOCK_CONFIRMATIONS = 3
+
+# Outcomes reported by the workers to the main thread
+ERROR = "error"
+STOPPED = "stopped"
+
+
+def RecordURLWithError(URL):
+    with open("URLsWithErrors.txt", "a+") as file:
+        file.write(URL + "\n")
+
+
+def AckEmployeeURLsInDB(workQueue, database):
+    ''' Acknowledges the pending URLs of profiles already in the database; returns how many '''
+    employeeURLsInDB = database.employeeURLIndex(
+        CONFIG.URL_INDEX_BLOOM, CONFIG.URL_INDEX_CAPACITY, CONFIG.URL_INDEX_PATH)
+
+    # Make sure we don't extract the same profile twice; only "non-extracted" profiles stay pending
+    employeeURLsAlreadyInDB = [URL for URL in workQueue.pending() if URL in employeeURLsInDB]
+    workQueue.ackAll(employeeURLsAlreadyInDB)
+    return len(employeeURLsAlreadyInDB)
+
+
+def scrapeWorker(workerId, driver, workQueue, pipeline, results):
+    ''' Claims URLs from the shared work queue and hands scraped employees to the persistence pipeline '''
     scrapingFailed = 0
-    successfulScrapes = 0
-    maxFailedScrapes = 5
-    for i, URL in enumerate(driver.__employeeURLsToBeScraped__):
-        if URL in driver.__employeeURLsInDB__:
-            print(URL, "Is already a profile in the database")
-            continue
+    # Different URLs that failed on a soft block in a row
+    blockedURLs = 0
+    try:
+        while scrapingFailed < MAX_FAILED_SCRAPES:
+            if driver.rateController is not None and driver.rateController.exhausted():
+                print("Worker", workerId, "stopped, the daily page budget is used up")
+                break
+
+            URL = workQueue.claim()
+            if URL is None:
+                break
 
-        try:
-            empList = [driver.ExtractProfileAttributes(URL)]
+            if URL in driver.__employeeURLsInDB__:
+                print(URL, "Is already a profile in the database")
+                workQueue.ack(URL)
+                METRICS.increment("profiles_total", outcome="skipped")
+                continue
+
+            try:
+                emp = driver.ExtractProfileAttributes(URL)
+            except:
+                print(URL, "cannot be extracted, deleting")
+                workQueue.fail(URL)
+                METRICS.increment("profiles_total", outcome="error")
+                results.put((ERROR, URL, None))
+                continue
 
             # Scraping has failed in some way (but an exception is not thrown)
-            if empList[0] is None:
+            if emp is None:
                 print(
                     "ERROR:", URL, "did not extract properly. There is either a bug or scraping was blocked.")
-                # If a URL has failed twice, remove it from the list (doesn't account for blocked scraping,
-                # but losing one datapoint is ok)
-                if previousFail == URL:
-                    successfulScrapes = i + 1
-                    scrapingFailed += 1
-                    continue
-                previousFail == URL
-
-                # If scraping has failed 5 times in a row, stop scraping and eliminate from list
-                # This is to account for blocked scraping
-                # This makes an assumption that 5 broken URLs in a row is unlikely
-                if scrapingFailed > maxFailedScrapes - 1:
-                    successfulScrapes = i
-                    break
+                scrapingFailed += 1
+                if driver.lastBlock is not None:
+                    blockedURLs += 1
+                    if blockedURLs >= BLOCK_CONFIRMATIONS:
+                        # Blocked, not broken: the URL is retried without counting the attempt
+                        workQueue.release(URL)
+                    else:
+                        workQueue.fail(URL, MAX_BLOCK_ATTEMPTS)
+                    METRICS.increment("profiles_total", outcome="blocked")
+                else:
+                    blockedURLs = 0
+                    workQueue.fail(URL, MAX_URL_ATTEMPTS)
+                    METRICS.increment("profiles_total", outcome="failed")
             else:
-                # Insert emp into database
                 scrapingFailed = 0
-                DATABASE.insertEmployees(empList)
-                successfulScrapes = i
-        except:
-            print(URL, "cannot be extracted, deleting")
-            WriteLinesToFile("employeeURLs.txt",
-                             driver.__employeeURLsToBeScraped__[i+1:])
-            with open("URLsWithErrors.txt", "a+") as file:
-                file.write(URL + "\n")
+                blockedURLs = 0
+                METRICS.increment("profiles_total", outcome="ok")
+                # Blocks while the database writer is behind
+                pipeline.put(URL, emp)
+
+        if scrapingFailed >= MAX_FAILED_SCRAPES:
+            print("Worker", workerId, "stopped after", scrapingFailed, "failed scrapes in a row")
+    finally:
+        results.put((STOPPED, workerId, None))
+
+
+def scrapeProfiles(workerCount=None):
+    if workerCount is None:
+        workerCount = CONFIG.SCRAPER_WORKERS
+
+    if CONFIG.METRICS_ENABLED:
+        InstrumentScraper(LinkedInScraper, LinkedInDB)
+
+    workQueue = WorkQueue(WORK_QUEUE_PATH, EMPLOYEE_URL_QUEUE)
+    # URLs claimed by a run that crashed are scraped again
+    workQueue.recover()
+
+    archive = PageArchive(CONFIG.ARCHIVE_PATH) if CONFIG.ARCHIVE_PATH else None
+    sessionStore = SessionStore(CONFIG.SESSION_STORE_PATH) if CONFIG.SESSION_STORE_PATH else None
+    username, password = CONFIG.credentials()
+    database = CONFIG.database()
+    # Done once for the whole pool rather than by every session
+    print(AckEmployeeURLsInDB(workQueue, database), "queued profiles are already in the database")
+
+    # One rate for every worker, persisted across runs
+    rateController = RateController(WORK_QUEUE_PATH, username, CONFIG.MAX_PAGES_PER_HOUR, CONFIG.MIN_PAGES_PER_HOUR,
+                                    CONFIG.MAX_PAGES_PER_DAY) if CONFIG.RATE_LIMITED else None
+
+    # Each worker drives its own LinkedInScraper session (one headless Chrome each)
+    drivers = []
+    for _ in range(workerCount):
+        driver = LinkedInScraper(username, password, CONFIG.DRIVER_PATH, database, workQueue, archive=archive,
+                                 sessionStore=sessionStore, rateController=rateController)
+        if getattr(driver, "driver", None) is None:
+            print("ERROR: Could not start a scraper session")
             continue
+        drivers.append(driver)
+
+    def inserted(URL):
+        workQueue.ack(URL)
+        METRICS.increment("inserts_total", outcome="ok")
+
+    def insertionFailed(URL, rejected):
+        if rejected:
+            # The database rejected the profile itself, scraping it again won't help
+            print(URL, "could not be inserted, deleting")
+            workQueue.fail(URL)
+            RecordURLWithError(URL)
+        else:
+            # The database was unavailable, the URL is retried like a failed scrape
+            print(URL, "could not be inserted, retrying later")
+            workQueue.fail(URL, MAX_URL_ATTEMPTS)
+        METRICS.increment("inserts_total", outcome="failed")
+
+    # Background writer: inserts emps into the database in batches while the browsers keep scraping
+    pipeline = PersistPipeline(database, onInserted=inserted, onFailed=insertionFailed)
+
+    results = queue.Queue()
+    workers = [threading.Thread(target=scrapeWorker, args=(i, driver, workQueue, pipeline, results), daemon=True)
+               for i, driver in enumerate(drivers)]
+    for worker in workers:
+        worker.start()
+
+    running = len(workers)
+    while running > 0:
+        outcome, URL, emp = results.get()
+
+        if outcome == STOPPED:
+            running -= 1
+        elif outcome == ERROR:
+            RecordURLWithError(URL)
+
+    for worker in workers:
+        worker.join()
+
+    # Flush every scraped emp before reporting
+    pipeline.close()
+    successfulScrapes = pipeline.inserted
+
+    for driver in drivers:
+        if driver.meter is not None:
+            print("Page loads:", driver.meter.summary())
+        driver.close()
+        if driver.fetcher is not None:
+            print("Fetched", driver.fetcher.fetched, "pages over HTTP,", driver.fetcher.missed, "in the browser")
+            driver.fetcher.close()
+
+    if archive is not None:
+        archive.close()
+
+    if rateController is not None:
+        print("Rate:", rateController.summary())
+        rateController.close()
 
-    # Rewrite file to chop off all successfully scraped files
-    WriteLinesToFile("employeeURLs.txt", driver.__employeeURLsToBeScraped__[
-                     successfulScrapes:])
     print(successfulScrapes, "profiles, successfully extracted")
+    print("Employee URL queue:", workQueue.counts())
+    workQueue.close()
+
+    ExportMetrics("scrapeProfiles")
+
 
+# Driver Code
+# Usage: python LinkedInProfileExtraction.py [--config scraper.json] [--<setting> value ...]
+if __name__ == "__main__":
+    CONFIG.loadArgs(sys.argv[1:], "Scrape the profiles in the employee URL queue")
 
-schedule.every().day.at("00:00").do(scrapeProfiles)
-schedule.every().day.at("02:00").do(scrapeProfiles)
-schedule.every().day.at("22:00").do(scrapeProfiles)
-schedule.every().day.at("04:00").do(scrapeProfiles)
-schedule.every().day.at("06:00").do(scrapeProfiles)
-schedule.every().day.at("08:00").do(scrapeProfiles)
-schedule.every().day.at("10:00").do(scrapeProfiles)
-schedule.every().day.at("12:00").do(scrapeProfiles)
+    schedule.every().day.at("00:00").do(scrapeProfiles)
+    schedule.every().day.at("02:00").do(scrapeProfiles)
+    schedule.every().day.at("22:00").do(scrapeProfiles)
+    schedule.every().day.at("04:00").do(scrapeProfiles)
+    schedule.every().day.at("06:00").do(scrapeProfiles)
+    schedule.every().day.at("08:00").do(scrapeProfiles)
+    schedule.every().day.at("10:00").do(scrapeProfiles)
+    schedule.every().day.at("12:00").do(scrapeProfiles)
 
-print("Initial Test Run of Profile Scraper...")
-scrapeProfiles()
+    print("Initial Test Run of Profile Scraper...")
+    scrapeProfiles()
 
-while True:
-    schedule.run_pending()
-    time.sleep(60)  # wait one minute
+    while True:
+        schedule.run_pending()
+        time.sleep(60)  # wait one minute
@@ -0,0 +1,127 @@
+from LinkedInScraper import LinkedInScraper
+from ScraperConfig import CONFIG
+from LinkedInDBAccess import LinkedInDB
+from PageArchive import PageArchive
+from RateController import RateController
+from SessionStore import SessionStore
+from ScraperMetrics import METRICS, InstrumentScraper, ExportMetrics
+from WorkQueue import WorkQueue, WORK_QUEUE_PATH, EMPLOYEE_URL_QUEUE
+
+from datetime import datetime, timedelta
+import schedule
+import sys
+import time
+
+"""
+LinkedInRefresh
+
+Description:
+    Keeps the profiles already in the database up to date. Each run loads the profiles last checked
+    (or first scraped) more than REFRESH_AFTER_DAYS ago, stalest first, fingerprints every section,
+    and only parses and writes the sections whose content changed, as minimal diffs to the
+    association tables (LinkedInDB.refreshEmployee). A profile whose sections are all unchanged
+    costs its page loads and one UPDATE of its fingerprints' checked_at.
+    The first refresh of a profile has no fingerprints to compare against, so every section is
+    written once.
+
+Usage:
+    python LinkedInRefresh.py [--config scraper.json] [--<setting> value ...]
+"""
+
+PROFILE_URL_PREFIX = "https://www.linkedin.com/in/"
+
+# Stop when refreshing has failed this many times in a row (most likely blocked)
+MAX_FAILED_REFRESHES = 5
+
+
+def refreshProfiles(batchSize=None, refreshAfterDays=None):
+    if batchSize is None:
+        batchSize = CONFIG.REFRESH_BATCH_SIZE
+    if refreshAfterDays is None:
+        refreshAfterDays = CONFIG.REFRESH_AFTER_DAYS
+
+    if CONFIG.METRICS_ENABLED:
+        InstrumentScraper(LinkedInScraper, LinkedInDB)
+
+    database = CONFIG.database()
+    staleProfiles = database.staleProfiles(batchSize, datetime.now() - timedelta(days=refreshAfterDays))
+    if not staleProfiles:
+        print("No profiles older than", refreshAfterDays, "days")
+        return
+
+    workQueue = WorkQueue(WORK_QUEUE_PATH, EMPLOYEE_URL_QUEUE)
+    archive = PageArchive(CONFIG.ARCHIVE_PATH) if CONFIG.ARCHIVE_PATH else None
+    sessionStore = SessionStore(CONFIG.SESSION_STORE_PATH) if CONFIG.SESSION_STORE_PATH else None
+    username, password = CONFIG.credentials()
+    rateController = RateController(WORK_QUEUE_PATH, username, CONFIG.MAX_PAGES_PER_HOUR, CONFIG.MIN_PAGES_PER_HOUR,
+                                    CONFIG.MAX_PAGES_PER_DAY) if CONFIG.RATE_LIMITED else None
+
+    driver = LinkedInScraper(username, password, CONFIG.DRIVER_PATH, database, workQueue, archive=archive,
+                             sessionStore=sessionStore, rateController=rateController)
+
+    refreshed = 0
+    unchanged = 0
+    refreshFailed = 0
+    if getattr(driver, "driver", None) is None:
+        print("ERROR: Could not start a scraper session")
+    else:
+        for user_url, fingerprints in staleProfiles:
+            if refreshFailed >= MAX_FAILED_REFRESHES:
+                print("Stopped after", refreshFailed, "failed refreshes in a row")
+                break
+            if rateController is not None and rateController.exhausted():
+                print("Stopped, the daily page budget is used up")
+                break
+
+            result = driver.RefreshProfileAttributes(PROFILE_URL_PREFIX + user_url, fingerprints)
+            if result is None:
+                print("ERROR:", user_url, "could not be refreshed")
+                refreshFailed += 1
+                METRICS.increment("refreshes_total", outcome="failed")
+                continue
+            refreshFailed = 0
+
+            employee, newFingerprints, changed = result
+            try:
+                counts = database.refreshEmployee(employee, newFingerprints, changed)
+            except Exception as error:
+                print(user_url, "could not be updated:", error)
+                METRICS.increment("refreshes_total", outcome="error")
+                continue
+
+            if changed:
+                print(user_url, "rows:", counts)
+                refreshed += 1
+                METRICS.increment("refreshes_total", outcome="changed")
+            else:
+                unchanged += 1
+                METRICS.increment("refreshes_total", outcome="unchanged")
+
+        driver.close()
+        if driver.fetcher is not None:
+            driver.fetcher.close()
+
+    if archive is not None:
+        archive.close()
+    if rateController is not None:
+        print("Rate:", rateController.summary())
+        rateController.close()
+    workQueue.close()
+
+    print(refreshed, "profiles changed,", unchanged, "unchanged,", "of", len(staleProfiles), "stale")
+    ExportMetrics("refreshProfiles")
+
+
+# Driver Code
+if __name__ == "__main__":
+    CONFIG.loadArgs(sys.argv[1:], "Refresh the stalest profiles in the database")
+
+    schedule.every().day.at("14:00").do(refreshProfiles)
+    schedule.every().day.at("18:00").do(refreshProfiles)
+
+    print("Initial Test Run of Profile Refresh...")
+    refreshProfiles()
+
+    while True:
+        schedule.run_pending()
+        time.sleep(60)  # wait one minute
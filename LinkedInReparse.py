@@ -0,0 +1,77 @@
+from ScraperConfig import CONFIG
+from LinkedInPageParser import ParseEmployeeProfile, ParseEmployeeExperiences, ParseEmployeeEducation, \
+    ParseEmployeeSkills
+from PageArchive import PageArchive, PROFILE, EXPERIENCE, EDUCATION, SKILLS
+
+import sys
+
+# Rebuilds Employee objects from the page archive and inserts them without touching the network
+# Usage: python LinkedInReparse.py [pathToArchive]
+
+
+def ReparseEmployee(archive, employeeURL):
+    currentEmployee = ParseEmployeeProfile(
+        archive.latest(employeeURL, PROFILE), employeeURL)
+
+    if currentEmployee is None:
+        return None
+
+    currentEmployee.experience = ParseEmployeeExperiences(
+        archive.latest(employeeURL, EXPERIENCE))  # List
+
+    if currentEmployee.experience is None:
+        return None
+
+    currentEmployee.education = ParseEmployeeEducation(
+        archive.latest(employeeURL, EDUCATION))  # List
+
+    if currentEmployee.education is None:
+        return None
+
+    currentEmployee.skills = ParseEmployeeSkills(
+        archive.latest(employeeURL, SKILLS))  # Dict
+
+    if currentEmployee.skills is None:
+        return None
+
+    return currentEmployee.compact()
+
+
+def reparseArchive(archivePath, batchSize=100):
+    archive = PageArchive(archivePath)
+    database = CONFIG.database()
+
+    reparsed = 0
+    failed = 0
+    empList = []
+    for URL in archive.urls():
+        emp = ReparseEmployee(archive, URL)
+
+        if emp is None:
+            print("ERROR:", URL, "could not be parsed from the archive")
+            failed += 1
+            continue
+
+        empList.append(emp)
+        if len(empList) == batchSize:
+            failedEmps = database.insertEmployees(empList)
+            reparsed += len(empList) - len(failedEmps)
+            failed += len(failedEmps)
+            empList = []
+
+    if empList:
+        failedEmps = database.insertEmployees(empList)
+        reparsed += len(empList) - len(failedEmps)
+        failed += len(failedEmps)
+
+    archive.close()
+    print(reparsed, "profiles reparsed,", failed, "failed")
+
+
+if __name__ == "__main__":
+    archivePath = sys.argv[1] if len(sys.argv) > 1 else CONFIG.ARCHIVE_PATH
+    if not archivePath:
+        print("Usage: python LinkedInReparse.py pathToArchive")
+        sys.exit(1)
+
+    reparseArchive(archivePath)
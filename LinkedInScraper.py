@@ -1,17 +1,28 @@
 from selenium.webdriver.support import expected_conditions as EC
-from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 
+import threading
 import time
-from typing import List, Set
 
 from Employee import Employee
 from Experience import Experience
 from Education import Education
 from LinkedInDBAccess import LinkedInDB
+from PageReadiness import PageReadiness
+from WorkQueue import WorkQueue
+from SearchCheckpoint import SearchCheckpoint
+from URLIndex import OrderedURLSet, StripQueryString
+from PageArchive import PageArchive, PROFILE, EXPERIENCE, EDUCATION, SKILLS, SECTIONS
+from LinkedInPageParser import ParseEmployeeProfile, ParseEmployeeExperiences, ParseEmployeeEducation, \
+    ParseEmployeeSkills, SectionFingerprint, HasElement
+from HTTPFetcher import HTTPFetcher
+from BrowserProfile import BrowserProfile, PageLoadMeter
+from SessionStore import SessionStore
+from RateController import RateController, DetectSoftBlock, CAPTCHA, AUTHWALL
+from ScraperConfig import CONFIG, SNAPSHOT
+from DateRangeParser import ParseDateRange, HasDuration
 
 
 def ReadLinesFromFile(textFilePath):
@@ -35,31 +46,80 @@ def AppendLinesToFile(textFilePath, array):
             file.write(line + '\n')
 
 
-def GetUsernameAndPassword(textFilePath):
-    with open(textFilePath, "r") as file:
-        username = ""
-        password = ""
-        for i, line in enumerate(file):
-            if i == 0:
-                username = line.strip()
-            elif i == 1:
-                password = line.strip()
+# Page of each profile section, relative to the profile URL
+SECTION_PATHS = {PROFILE: "", EXPERIENCE: "/details/experience", EDUCATION: "/details/education",
+                 SKILLS: "/details/skills"}
+# Element a section is complete enough to be fingerprinted once present
+SECTION_READY_XPATHS = {PROFILE: "//main/section[1]", EXPERIENCE: "//main/section/div[2]/div/div[1]/ul",
+                        EDUCATION: "//main//ul", SKILLS: "//main/section/div[2]/div[1]"}
+
+
+# Settings (DRIVER_PATH, SCRAPER_WORKERS, ...) live in ScraperConfig and are resolved on first use
+def __getattr__(name):
+    ''' Module attributes resolved lazily: nothing is read or connected to at import time '''
+    if name == "DATABASE":
+        return CONFIG.database()
+    if name in ("USERNAME", "PASSWORD"):
+        return CONFIG.credentials()[name == "PASSWORD"]
+    if name in ("DATABASE_USERNAME", "DATABASE_PASSWORD"):
+        return CONFIG.databaseCredentials()[name == "DATABASE_PASSWORD"]
+    if name in CONFIG:
+        return getattr(CONFIG, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def BuildURLQuery(query):
+    # Convert query string to a URLQuery
+    queryArr = query.split(' ')
+    URLQuery = ''
+
+    for i, searchTerm in enumerate(queryArr):
+        searchTerm = searchTerm.replace('&', '%26')
+        if i == 0:
+            URLQuery = searchTerm
+        else:
+            # LinkedIn Separates Search Terms by %20 instead of whitespace
+            URLQuery += ('%20' + searchTerm)
+
+    return URLQuery
+
+
+def SplitPages(pages, parts):
+    # Contiguous, nearly equal ranges, one per session
+    size, extra = divmod(len(pages), parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(pages[start:end])
+        start = end
+    return [pageRange for pageRange in ranges if pageRange]
+
 
-        return username, password
+def HarvestSearchPagesInParallel(sessions, URLQuery, pages, onPage=None):
+    ''' Spreads the pages across the sessions; returns page -> URLs, or None if any session failed '''
+    pageRanges = SplitPages(pages, len(sessions))
+    results = [None] * len(pageRanges)
 
+    def harvest(i):
+        results[i] = sessions[i].HarvestSearchPages(URLQuery, pageRanges[i], onPage)
 
-# Change to desired driver path
-DRIVER_PATH = "/Users/danieljo/LinkedInScraper/chromedriver"
+    threads = [threading.Thread(target=harvest, args=(i,), daemon=True)
+               for i in range(len(pageRanges))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
 
+    # All or nothing: a single failed range fails the whole query
+    if any(result is None for result in results):
+        return None
+
+    harvested = {}
+    for result in results:
+        harvested.update(result)
+    return harvested
 
-# Either change driver code, or create a file called "creds.txt" in the working directory
-USERNAME, PASSWORD = GetUsernameAndPassword("creds.txt")
-DATABASE_USERNAME, DATABASE_PASSWORD = GetUsernameAndPassword("dbcreds.txt")
-DATABASE_NAME = "linkedin"
-HOST = "10.33.113.250"
-PORT = 3308
-DATABASE = LinkedInDB(DATABASE_NAME, HOST, PORT,
-                      DATABASE_USERNAME, DATABASE_PASSWORD)
 
 """
 LinkedInScraper
@@ -73,31 +133,79 @@ Description:
 class LinkedInScraper:
     # Dev Note: 11/16/2021 WORKING
     # Initializes driver
-    def __init__(self, username, password, driver_path, database: LinkedInDB):
+    def __init__(self, username, password, driver_path, database: LinkedInDB, workQueue: WorkQueue,
+                 parser=None, archive: PageArchive = None, httpFetch=None,
+                 browserProfile: BrowserProfile = None, sessionStore: SessionStore = None,
+                 interactive=None, rateController: RateController = None):
         # Database connection and methods for inserting employee information
         self.database = database
 
+        # LIVE_DOM or SNAPSHOT parsing of the profile detail sections
+        self.parser = parser if parser is not None else CONFIG.SCRAPER_PARSER
+
+        # Optional store of the HTML of every section scraped
+        self.archive = archive
+
+        # Optional HTTP client for the pages that don't need the browser, set up after login
+        self.fetcher = None
+        self.meter = None
+
+        # Paces page loads and backs off on soft blocks; shared by every session of the account
+        self.rateController = rateController
+
+        # The session is saved again on close, since LinkedIn refreshes its cookies while it is used
+        self.username = username
+        self.sessionStore = sessionStore
+        # Soft block shown by the page of the last failed extraction, if any
+        self.lastBlock = None
+
         if self.database is None:
             return None
         else:
-            self.__employeeURLsInDB__ = self.database.__loadEmployeeURLs__()
+            # Shared by every session; only profiles inserted since the last sync are loaded
+            self.__employeeURLsInDB__ = self.database.employeeURLIndex(
+                CONFIG.URL_INDEX_BLOOM, CONFIG.URL_INDEX_CAPACITY, CONFIG.URL_INDEX_PATH)
+
+        # Durable queue of the employee URLs to be scraped
+        self.workQueue = workQueue
 
-        # Stores the URL of each employee discovered in a LinkedIn query
-        self.__employeeURLsToBeScraped__ = self.ExtractEmployeeURLsToBeScraped(
-            "employeeURLs.txt")
+        # Stores the URL of each employee this session discovered in a LinkedIn query
+        # (the queue itself skips URLs that were queued before)
+        self.__employeeURLsToBeScraped__ = OrderedURLSet()
 
         # Contains the newly found employeeURLs
         self.newEmployeeURLs = []
 
         # Specifying options to help driver be more efficient
-        chrome_options = webdriver.ChromeOptions()
+        if browserProfile is None:
+            browserProfile = BrowserProfile(lean=CONFIG.LEAN_BROWSER, measure=CONFIG.MEASURE_PAGE_LOADS)
+
+        self.driver = browserProfile.start(driver_path)
+
+        # Per-page transfer and load time, when the profile records them
+        self.meter = PageLoadMeter(self.driver) if browserProfile.measure else None
+
+        # Waits for pages and lists to finish rendering instead of sleeping
+        self.readiness = PageReadiness(self.driver)
 
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--window-size=1920x1080")
+        # A saved session skips the login form (and its PIN prompt) while LinkedIn still accepts it
+        if sessionStore is None or not sessionStore.restore(username, self.driver):
+            if interactive is None:
+                interactive = CONFIG.INTERACTIVE_LOGIN
+            if not self.__login__(username, password, interactive):
+                return None
+
+            if sessionStore is not None:
+                sessionStore.save(username, self.driver)
 
-        self.driver = webdriver.Chrome(
-            executable_path=driver_path, options=chrome_options)
+        if httpFetch is None:
+            httpFetch = CONFIG.HTTP_FETCH
+        if httpFetch:
+            self.fetcher = HTTPFetcher(CONFIG.HTTP_BASE_URL, rateController=self.rateController)
+            self.fetcher.copyCookies(self.driver)
 
+    def __login__(self, username, password, interactive):
+        ''' Logs in through the login form; True once the feed loads '''
         self.driver.get("https://linkedin.com/home")
 
         try:
@@ -117,8 +225,7 @@ class LinkedInScraper:
                      "/html/body/main/section[1]/div/div/form/button"))).click()
         except TimeoutException:
             print("ERROR: Could not login properly")
-            self.driver = None
-            return None
+            return self.__loginFailed__()
 
         # Sometimes I am stopped for being a robot, this gives me time to prove I'm human
         # Otherwise, proceeds with program execution if element is found
@@ -140,6 +247,11 @@ class LinkedInScraper:
                 try:
                     inputElement = main.find_element(By.NAME, "pin")
 
+                    if not interactive:
+                        # Unattended runs fail here instead of waiting for input that never comes
+                        print("ERROR: PIN required, log in once interactively to save a session")
+                        return self.__loginFailed__()
+
                     print("Enter pin:", end="")
                     pin = input()
 
@@ -158,31 +270,36 @@ class LinkedInScraper:
                          "#voyager-feed")))
             except TimeoutException:
                 print("ERROR: Captcha needed")
-                return None
+                return self.__loginFailed__()
 
-    def ExtractEmployeeURLsToBeScraped(self, pathToEmployeeURLsFile):
-        employeeURLsToBeScraped = []
-
-        employeeURLsInFile = ReadLinesFromFile(pathToEmployeeURLsFile)
+        return True
 
-        # Make sure we don't extract the same profile twice
-        for URL in employeeURLsInFile:
-            if URL not in self.__employeeURLsInDB__:
-                employeeURLsToBeScraped.append(URL)
+    def __loginFailed__(self):
+        ''' Closes the logged-out browser, so callers skip this session (driver is None) '''
+        self.driver.quit()
+        self.driver = None
+        return False
 
-        # Rewrite text file to only contain "non-extracted" profiles
-        WriteLinesToFile(pathToEmployeeURLsFile, employeeURLsToBeScraped)
+    def close(self):
+        ''' Saves the session's current cookies (unless it ended logged out) and quits the browser '''
+        if self.sessionStore is not None:
+            try:
+                if DetectSoftBlock(self.driver.current_url, self.driver.page_source) not in (CAPTCHA, AUTHWALL):
+                    self.sessionStore.save(self.username, self.driver)
+            except WebDriverException as error:
+                print("WARNING: Could not save the session of", self.username, error)
 
-        return employeeURLsToBeScraped
+        self.driver.quit()
+        self.driver = None
 
     """
-    LinkedInScraper::AddEmployeeURLsFromSearchPage
+    LinkedInScraper::CollectEmployeeURLsFromSearchPage
 
     Description:
-        Adds all unique employee URLs to the employeeURLs set
+        Returns the profile URLs on the loaded search page ([] if it has no results), or None if it could not be parsed
     """
 
-    def AddEmployeeURLsFromSearchPage(self):
+    def CollectEmployeeURLsFromSearchPage(self):
         main = None
         tries = 0
 
@@ -208,11 +325,11 @@ class LinkedInScraper:
                 refresh = True
 
         if main is None:
-            return False
+            return None
 
         try:
             if main.find_element(By.XPATH, "./div/div/div[1]/section/h2").text == "No results found":
-                return True
+                return []
         except NoSuchElementException:
             pass
 
@@ -223,6 +340,7 @@ class LinkedInScraper:
         peopleList = peopleDiv.find_elements(By.XPATH, "./li")
         previousLink = ""
 
+        URLs = []
         for i, element in enumerate(peopleList):
             # Can be no more than 10 results per page
             # Need to have better break criteria than this
@@ -236,53 +354,49 @@ class LinkedInScraper:
                 # Checks if profile is accessible (Not "LinkedIn Member")
                 if link[25:27] == "in":
                     # Format link to only include profile ID
-                    endLinkPosition = 0
-                    for i, char in enumerate(link):
-                        if char == '?':
-                            endLinkPosition = i
-
-                    URL = link[:endLinkPosition]
-                    if URL not in self.__employeeURLsToBeScraped__:
-                        self.__employeeURLsToBeScraped__.append(URL)
-                        self.newEmployeeURLs.append(URL)
-                        previousLink = link
+                    URLs.append(StripQueryString(link))
+                    previousLink = link
                 # Otherwise, the link has no relevance
             except NoSuchElementException:
                 print(f"Inspect element at {XPathLocation}")
                 print("Previously Successful:", previousLink)
-                return False
+                return None
 
-        return True
+        return URLs
 
     """
-    LinkedInScraper::LinkedInPeopleSearch
+    LinkedInScraper::AddEmployeeURLsFromSearchPage
 
     Description:
-        After authentication, converts the query into a format recognizable to LinkedIn 
-        and passes the query into LinkedIn's search engine and calls the
-        AddEmployeeURLsFromSearchPage to append to employeeURLs set
+        Adds all unique employee URLs to the employeeURLs set
+    """
+
+    def AddEmployeeURLsFromSearchPage(self):
+        URLs = self.CollectEmployeeURLsFromSearchPage()
+
+        if URLs is None:
+            return False
+
+        self.__addNewEmployeeURLs__(URLs)
+        return True
+
+    def __addNewEmployeeURLs__(self, URLs):
+        for URL in URLs:
+            if URL not in self.__employeeURLsInDB__ and self.__employeeURLsToBeScraped__.append(URL):
+                self.newEmployeeURLs.append(URL)
 
-    Parameters:
-        query - A string entered in how you would in the LinkedIn GUI. Converted into a URL query argument
     """
+    LinkedInScraper::ReadSearchPageCount
 
-    def LinkedInPeopleSearch(self, query: str, outputFilePath: str):
-        print("Query:", query)
-        # Convert query string to a URLQuery
-        queryArr = query.split(' ')
-        URLQuery = ''
-
-        for i, searchTerm in enumerate(queryArr):
-            searchTerm = searchTerm.replace('&', '%26')
-            if i == 0:
-                URLQuery = searchTerm
-            else:
-                # LinkedIn Separates Search Terms by %20 instead of whitespace
-                URLQuery += ('%20' + searchTerm)
+    Description:
+        Loads the first results page of a query and reads how many pages it has
+        Returns 0 if the query has no results and None if the page could not be read
+    """
 
+    def ReadSearchPageCount(self, URLQuery: str):
         # Navigate to webpage
         # Example: https://www.linkedin.com/search/results/people/?keywords=Amazon%20Software%20Engineer%20Seattle,%20WA
-        self.driver.get(
+        self.__loadPage__(
             f"https://www.linkedin.com/search/results/people/?keywords={URLQuery}")
 
         # JS Elements were not rendering without scrolling
@@ -295,13 +409,13 @@ class LinkedInScraper:
             main = self.driver.find_element(By.TAG_NAME, "main")
         except NoSuchElementException:
             print("Could not find main")
-            return False
+            self.__reportOutcome__(False)
+            return None
 
         try:
             if main.find_element(By.XPATH, "./div/div/div/section/h2").text == "No results found":
-                # Remove query from file
                 print("No results found")
-                return True
+                return 0
         except NoSuchElementException:
             print("Results found")
 
@@ -321,15 +435,25 @@ class LinkedInScraper:
                     "Page count button not found at ./div/div/div[5]/div/div/ul/li[last()]/button/span")
 
         if pageButtonCount is not None:
-            maxPageCount = int(pageButtonCount.text)
-        else:
-            maxPageCount = 1
+            return int(pageButtonCount.text)
 
-        print("Number of pages to parse:", maxPageCount)
+        return 1
+
+    """
+    LinkedInScraper::HarvestSearchPages
+
+    Description:
+        Loads each results page of a query and collects its profile URLs
+        Returns a dictionary of page -> URLs, or None as soon as a page fails
+        onPage(page, URLs) is called as soon as each page was harvested
+    """
 
-        for page in range(1, maxPageCount + 1):
+    def HarvestSearchPages(self, URLQuery: str, pages, onPage=None):
+        harvested = {}
 
-            if page == 1:
+        for page in pages:
+
+            if page == pages[0]:
                 print("Parsing page:", page, end="")
             else:
                 if page % 10 == 0:
@@ -337,21 +461,104 @@ class LinkedInScraper:
                 else:
                     print("", page, end="")
 
-            self.driver.get(
+            if self.rateController is not None and self.rateController.exhausted():
+                print("\nDaily page budget used up (page", page, ")")
+                return None
+
+            self.__loadPage__(
                 f"https://www.linkedin.com/search/results/people/?keywords={URLQuery}&page={str(page)}")
-            success = self.AddEmployeeURLsFromSearchPage()
+            URLs = self.CollectEmployeeURLsFromSearchPage()
+            self.__reportOutcome__(URLs is not None)
+
+            if URLs is None:
+                print("\nERROR: Adding Employee URLs From Search Page was not successful (page", page, ")")
+                return None
+
+            harvested[page] = URLs
+            if onPage is not None:
+                onPage(page, URLs)
+
+        return harvested
+
+    """
+    LinkedInScraper::LinkedInPeopleSearch
 
-            if not success:
-                print("ERROR: Adding Employee URLs From Search Page was not successful")
+    Description:
+        After authentication, converts the query into a format recognizable to LinkedIn 
+        and passes the query into LinkedIn's search engine and calls the
+        AddEmployeeURLsFromSearchPage to append to employeeURLs set
+        The URLs of each page are queued as soon as every page before it was harvested, and the
+        checkpoint records the last queued page, so a failed query resumes after it on the next run
+
+    Parameters:
+        query - A string entered in how you would in the LinkedIn GUI. Converted into a URL query argument
+        helpers - Other logged-in LinkedInScraper sessions the page range is spread across
+        checkpoint - SearchCheckpoint the per-query cursor is persisted to (None to always start at page 1)
+    """
+
+    def LinkedInPeopleSearch(self, query: str, helpers=(), checkpoint: SearchCheckpoint = None):
+        print("Query:", query)
+        URLQuery = BuildURLQuery(query)
+
+        cursor = checkpoint.get(query) if checkpoint is not None else None
+
+        if cursor is not None:
+            lastPage, maxPageCount = cursor
+            print("Resuming after page", lastPage, "of", maxPageCount)
+        else:
+            lastPage = 0
+            maxPageCount = self.ReadSearchPageCount(URLQuery)
+
+            if maxPageCount is None:
                 return False
 
-        print("\nSuccessfully extracted all profiles for:", query, "\n")
-        print("Appending ->", len(self.newEmployeeURLs),
-              "new URLs to employee URL file")
-        AppendLinesToFile(outputFilePath, self.newEmployeeURLs)
-        # Reset to nothing
-        self.newEmployeeURLs = []
-        print()
+            if maxPageCount == 0:
+                # Remove query from file
+                return True
+
+            if checkpoint is not None:
+                checkpoint.save(query, lastPage, maxPageCount)
+
+        print("Number of pages to parse:", maxPageCount - lastPage)
+
+        pages = list(range(lastPage + 1, maxPageCount + 1))
+        sessions = [self] + [helper for helper in helpers
+                             if getattr(helper, "driver", None) is not None]
+
+        # Pages harvested out of order wait here until every page before them is queued
+        waiting = {}
+        queued = [lastPage, 0]
+        lock = threading.Lock()
+
+        def queuePage(page, URLs):
+            with lock:
+                waiting[page] = URLs
+                # Queue in page order so the result doesn't depend on which session finished first
+                while queued[0] + 1 in waiting:
+                    self.__addNewEmployeeURLs__(waiting.pop(queued[0] + 1))
+                    queued[1] += self.workQueue.put(self.newEmployeeURLs)
+                    # Reset to nothing
+                    self.newEmployeeURLs = []
+                    queued[0] += 1
+
+                    if checkpoint is not None:
+                        checkpoint.save(query, queued[0], maxPageCount)
+
+        if len(sessions) == 1:
+            harvested = self.HarvestSearchPages(URLQuery, pages, queuePage)
+        else:
+            harvested = HarvestSearchPagesInParallel(sessions, URLQuery, pages, queuePage)
+
+        print("\nAppended ->", queued[1], "new URLs to employee URL queue")
+
+        if harvested is None:
+            print("Stopped after page", queued[0], "of", maxPageCount, "for:", query, "\n")
+            return False
+
+        if checkpoint is not None:
+            checkpoint.clear(query)
+
+        print("Successfully extracted all profiles for:", query, "\n")
         return True
 
     def ExtractEmployeeExperiences(self, employeeURL):
@@ -359,8 +566,19 @@ class LinkedInScraper:
 
         experiences = []
 
+        if self.fetcher is not None:
+            experiences = self.__fetchSection__(employeeURL, employeeURL + "/details/experience", EXPERIENCE,
+                                                ParseEmployeeExperiences)
+            if experiences is not None:
+                return experiences
+
         # profileurl/details/experience
-        self.driver.get(employeeURL + "/details/experience")
+        self.__loadPage__(employeeURL + "/details/experience")
+
+        if self.parser == SNAPSHOT:
+            # The snapshot is only taken once every experience has rendered
+            self.readiness.waitForSection(SECTION_READY_XPATHS[EXPERIENCE] + "/li", 5)
+            return ParseEmployeeExperiences(self.__archiveSection__(employeeURL, EXPERIENCE))
 
         # All information contained within <main>
         expSection = None
@@ -397,6 +615,9 @@ class LinkedInScraper:
             # print(ul.text)
             # print()
 
+            if self.archive is not None:
+                self.__archiveSection__(employeeURL, EXPERIENCE)
+
             try:
                 # Assuming the workers can have no more than 100 jobs
                 expList = ul.find_elements(By.XPATH, "./li")
@@ -504,19 +725,19 @@ class LinkedInScraper:
                                                         "./div/div[2]/div/a/span/span[1]").text
                         except NoSuchElementException:
                             pass
-                        if "mos" not in dates and "yrs" not in dates and "yr" not in dates and "mo" not in dates:
+                        if not HasDuration(dates):
                             try:
                                 dates = subExp.find_element(By.XPATH,
                                                             "./div/div[2]/div[1]/a/span[2]/span[1]").text
                             except NoSuchElementException:
                                 pass
-                        if "mos" not in dates and "yrs" not in dates and "yr" not in dates and "mo" not in dates:
+                        if not HasDuration(dates):
                             try:
                                 dates = subExp.find_element(By.XPATH,
                                                             "./div/div[2]/div[1]/a/span[1]/span[1]").text
                             except NoSuchElementException:
                                 pass
-                        if "mos" not in dates and "yrs" not in dates and "yr" not in dates and "mo" not in dates:
+                        if not HasDuration(dates):
                             print("ERROR: Could not find valid date")
                             print(
                                 "Here is the experience element that caused the problem:")
@@ -524,23 +745,7 @@ class LinkedInScraper:
                                   experience.company_name)
                             return None
                         # Nov 2021 - Present · 2 mos
-                        skipEnd = False
-                        try:
-                            dashInd = dates.rindex("-")
-                            experience.start_date = dates[:dashInd].strip()
-                        except:
-                            # Date didn't have a dash because it is only a single value
-                            experience.start_date = dates.split("·")[0].strip()
-                            experience.end_date = None
-                            skipEnd = True
-
-                        if not skipEnd:
-                            try:
-                                dotInd = dates.rindex('·')
-                                experience.end_date = dates[dashInd +
-                                                            2:dotInd].strip()
-                            except ValueError:
-                                experience.end_date = dates[dashInd + 2:].strip()
+                        experience.start_date, experience.end_date, _ = ParseDateRange(dates)
                     except NoSuchElementException:
                         print("ERROR: Could not find date")
                         return None
@@ -591,42 +796,11 @@ class LinkedInScraper:
 
                 # Dates
                 try:
-                    # Flag if this date does not contain a -
-                    noEnd = False
                     dates = exp.find_element(
                         By.XPATH, "./div/div/div[2]/div/div[1]/span[2]/span[1]").text
 
-                    try:
-                        # In case the end of the date is included by accident
-                        dotInd = dates.rindex("·")
-                        dates = dates[:dotInd].strip()
-                    except ValueError:
-                        pass
-
                     # Nov 2021 - Present · 2 mos
-                    try:
-                        dashInd = dates.rindex("-")
-                    except ValueError:
-                        noEnd = True
-                        spaces = 0
-                        for i, char in enumerate(dates):
-                            if char == ' ':
-                                spaces += 1
-                            if spaces == 2:
-                                dashInd = i
-                                break
-
-                    experience.start_date = dates[:dashInd].strip()
-
-                    if noEnd == False:
-                        try:
-                            dotInd = dates.rindex('·')
-                            experience.end_date = dates[dashInd +
-                                                        2:dotInd].strip()
-                        except ValueError:
-                            experience.end_date = dates[dashInd + 2:].strip()
-                    else:
-                        experience.end_date = None
+                    experience.start_date, experience.end_date, _ = ParseDateRange(dates)
                 except NoSuchElementException:
                     pass
 
@@ -646,7 +820,18 @@ class LinkedInScraper:
     def ExtractEmployeeEducation(self, employeeURL):
         print("Extracting education from:", employeeURL)
         education = []
-        self.driver.get(employeeURL + "/details/education")
+
+        if self.fetcher is not None:
+            fetched = self.__fetchSection__(employeeURL, employeeURL + "/details/education", EDUCATION,
+                                            ParseEmployeeEducation)
+            if fetched is not None:
+                return fetched
+
+        self.__loadPage__(employeeURL + "/details/education")
+
+        if self.parser == SNAPSHOT:
+            self.readiness.waitForSection(SECTION_READY_XPATHS[EDUCATION] + "/li", 5)
+            return ParseEmployeeEducation(self.__archiveSection__(employeeURL, EDUCATION))
 
         main = None
         try:
@@ -668,6 +853,9 @@ class LinkedInScraper:
             print("Could not find education list <ul>")
             return None
 
+        if self.archive is not None:
+            self.__archiveSection__(employeeURL, EDUCATION)
+
         educationList = None
         try:
             educationList = educationUL.find_elements(By.XPATH, "./li")
@@ -739,9 +927,9 @@ class LinkedInScraper:
             try:
                 dates = educationElem.find_element(
                     By.XPATH, "./div/div/div[2]/div[1]/a/span[2]/span[1]").text
-                dateArr = dates.split(" - ")
-                edu.start_date = dateArr[0]
-                edu.end_date = dateArr[-1]
+                # A single year is both the start and the end
+                edu.start_date, edu.end_date, _ = ParseDateRange(dates)
+                edu.end_date = edu.end_date or edu.start_date
             except NoSuchElementException:
                 edu.start_date = ""
                 edu.end_date = ""
@@ -754,9 +942,10 @@ class LinkedInScraper:
         print("Extracting skills from:", employeeURL)
         skills = {}
         # Navigate to skills webpage
-        self.driver.get(employeeURL + "/details/skills")
+        self.__loadPage__(employeeURL + "/details/skills")
 
-        time.sleep(10)
+        # The skills page keeps rendering after the document loads
+        self.waitForJStoLoad(10)
 
         main = None
         try:
@@ -778,6 +967,8 @@ class LinkedInScraper:
                      "./section/div[2]/div[1]")))
         except TimeoutException:
             print("Could not find buttons [1]")
+            if self.archive is not None:
+                self.__archiveSection__(employeeURL, SKILLS)
             return {}
 
         buttons = None
@@ -791,19 +982,24 @@ class LinkedInScraper:
         if len(buttons) > 1:
             buttons = buttons[1:]
 
+        if self.parser == SNAPSHOT:
+            # Render every category list, then parse them all from a single snapshot
+            for i, button in enumerate(buttons):
+                button.click()
+                self.readiness.waitForStableList(
+                    main, f"./section/div[2]/div[{3 + i}]/div/div/div[1]/ul/li", 5)
+            return ParseEmployeeSkills(self.__archiveSection__(employeeURL, SKILLS))
+
         for i, button in enumerate(buttons):
             skillCategory = button.text
             skills[skillCategory] = []
-            # Click the button
+            # Click the button and wait for its category list to finish rendering
             button.click()
-            categoryList = None
-            try:
-                categoryListParent = main.find_element(
-                    By.XPATH, f"./section/div[2]/div[{3 + i}]/div/div/div[1]/ul")
-                categoryList = categoryListParent.find_elements(
-                    By.XPATH, "./li")
-            except NoSuchElementException:
+            categoryList = self.readiness.waitForStableList(
+                main, f"./section/div[2]/div[{3 + i}]/div/div/div[1]/ul/li", 5)
+            if categoryList is None:
                 print("Could not extract skill category list")
+                categoryList = []
 
             # Iterate through individual skills within category
             for skillElem in categoryList:
@@ -821,15 +1017,17 @@ class LinkedInScraper:
                         print("ERROR: Skill within category not found")
                         return None
 
+        if self.archive is not None:
+            self.__archiveSection__(employeeURL, SKILLS)
+
         return skills
 
     def ExtractEmployeeAccomplishments(self, employeeURL):
         pass
 
-    # Dev Note: 12/29/2021 WORKING
-    def ExtractProfileAttributes(self, employeeURL: str) -> Employee:
+    def __extractTopCard__(self, employeeURL: str) -> Employee:
         # Navigate to web page
-        self.driver.get(employeeURL)
+        self.__loadPage__(employeeURL)
 
         print("Extracting attributes from: ", employeeURL, sep="")
 
@@ -844,6 +1042,9 @@ class LinkedInScraper:
             print("ERROR: Could not find <main>")
             return None
 
+        if self.archive is not None:
+            self.__archiveSection__(employeeURL, PROFILE)
+
         # Initialize Employee Object
         currentEmployee = Employee()
 
@@ -892,32 +1093,194 @@ class LinkedInScraper:
         except TimeoutException:
             pass
 
+        return currentEmployee
+
+    # Dev Note: 12/29/2021 WORKING
+    def ExtractProfileAttributes(self, employeeURL: str) -> Employee:
+        currentEmployee = self.__extractProfile__(employeeURL)
+        self.__reportOutcome__(currentEmployee is not None)
+        return currentEmployee
+
+    def __extractProfile__(self, employeeURL: str) -> Employee:
+        currentEmployee = None
+        if self.fetcher is not None:
+            currentEmployee = self.__fetchSection__(employeeURL, employeeURL, PROFILE,
+                                                    lambda pageSource: ParseEmployeeProfile(pageSource, employeeURL))
+            # Without a name the top card was not server-rendered
+            if currentEmployee is not None and not currentEmployee.name:
+                currentEmployee = None
+
+        if currentEmployee is None:
+            currentEmployee = self.__extractTopCard__(employeeURL)
+
+        if currentEmployee is None:
+            return None
+
         print("Successfully extracted base elements for", employeeURL)
         #currentEmployee.website = None
-        currentEmployee.experience = self.ExtractEmployeeExperiences(
-            employeeURL)  # List
+        # With an archive, a section that fails (but isn't a soft block) is archived as loaded and the
+        # remaining sections are still extracted, so the profile can be re-parsed once the selector is fixed
+        extracted = True
+        for section, attribute, extract in ((EXPERIENCE, "experience", self.ExtractEmployeeExperiences),  # List
+                                            (EDUCATION, "education", self.ExtractEmployeeEducation),  # List
+                                            (SKILLS, "skills", self.ExtractEmployeeSkills)):  # Dict
+            value = extract(employeeURL)
+            if value is None:
+                if self.archive is None or DetectSoftBlock(self.driver.current_url, self.driver.page_source):
+                    return None
+                self.__archiveSection__(employeeURL, section)
+                extracted = False
+            setattr(currentEmployee, attribute, value)
 
-        if currentEmployee.experience is None:
+        if not extracted:
             return None
 
-        currentEmployee.education = self.ExtractEmployeeEducation(
-            employeeURL)  # List
+        return currentEmployee.compact()
 
-        if currentEmployee.education is None:
-            return None
+    """
+    LinkedInScraper::RefreshProfileAttributes
+
+    Description:
+        Loads every section of a profile that is already in the database and fingerprints it
+        (LinkedInPageParser.SectionFingerprint). Sections whose fingerprint matches the stored one
+        are not parsed; the others are parsed from the same snapshot, falling back to the live
+        extraction if the snapshot parser can't read them. The skills section is always extracted
+        live when it changed, since its category lists only render once clicked.
+        Returns (employee, fingerprints, changed sections) for LinkedInDB.refreshEmployee, or None
+        if a changed section could not be extracted.
 
-        currentEmployee.skills = self.ExtractEmployeeSkills(
-            employeeURL)  # Dict
+    Parameters:
+        fingerprints - Stored section -> fingerprint of the profile ({} if it was never refreshed)
+    """
 
-        if currentEmployee.skills is None:
+    def RefreshProfileAttributes(self, employeeURL: str, fingerprints):
+        refreshed = self.__refreshProfile__(employeeURL, fingerprints)
+        self.__reportOutcome__(refreshed is not None)
+        return refreshed
+
+    def __refreshProfile__(self, employeeURL, fingerprints):
+        print("Refreshing:", employeeURL)
+        currentEmployee = Employee()
+        currentEmployee.user_url_id = employeeURL.split("/")[-1]
+
+        newFingerprints = {}
+        changed = set()
+        for section in SECTIONS:
+            pageSource = self.__loadSectionSource__(employeeURL, section)
+            fingerprint = SectionFingerprint(pageSource)
+            if fingerprint is None:
+                print("Could not find main of the", section, "section")
+                return None
+
+            newFingerprints[section] = fingerprint
+            if fingerprint == fingerprints.get(section):
+                continue
+            changed.add(section)
+
+            if section == PROFILE:
+                parsed = ParseEmployeeProfile(pageSource, employeeURL)
+                if parsed is None or not parsed.name:
+                    parsed = self.__extractTopCard__(employeeURL)
+                if parsed is None:
+                    return None
+                currentEmployee.name, currentEmployee.location = parsed.name, parsed.location
+                currentEmployee.header, currentEmployee.about = parsed.header, parsed.about
+            elif section == EXPERIENCE:
+                currentEmployee.experience = ParseEmployeeExperiences(pageSource)
+                if currentEmployee.experience is None:
+                    currentEmployee.experience = self.ExtractEmployeeExperiences(employeeURL)
+                if currentEmployee.experience is None:
+                    return None
+            elif section == EDUCATION:
+                currentEmployee.education = ParseEmployeeEducation(pageSource)
+                if currentEmployee.education is None:
+                    currentEmployee.education = self.ExtractEmployeeEducation(employeeURL)
+                if currentEmployee.education is None:
+                    return None
+            else:
+                currentEmployee.skills = self.ExtractEmployeeSkills(employeeURL)
+                if currentEmployee.skills is None:
+                    return None
+
+        print("Changed sections:", ", ".join(sorted(changed)) or "none")
+        return currentEmployee.compact(), newFingerprints, changed
+
+    def __loadSectionSource__(self, employeeURL, section):
+        ''' HTML of a profile section, fetched over HTTP when possible, otherwise rendered in the browser '''
+        URL = employeeURL + SECTION_PATHS[section]
+        if self.fetcher is not None and section != SKILLS:
+            pageSource = self.fetcher.fetch(URL)
+            # A page without the section's content was not server-rendered, and its fingerprint means nothing
+            if pageSource is not None and HasElement(pageSource, SECTION_READY_XPATHS[section]):
+                if self.archive is not None:
+                    self.archive.store(employeeURL, section, pageSource)
+                return pageSource
+
+        self.__loadPage__(URL)
+        if section == SKILLS:
+            # The skills page keeps rendering after the document loads
+            self.waitForJStoLoad(10)
+        self.__waitForElement__(SECTION_READY_XPATHS[section], 2)
+        return self.__archiveSection__(employeeURL, section)
+
+    def __fetchSection__(self, employeeURL, URL, section, parse):
+        ''' Fetches and parses a page without the browser; None when it has to be loaded in the browser '''
+        # The skills page is only complete after its category buttons were clicked, so it is never fetched
+        pageSource = self.fetcher.fetch(URL)
+        if pageSource is None:
             return None
 
-        return currentEmployee
+        parsed = parse(pageSource)
+        if parsed is None:
+            print("Falling back to the browser for", URL)
+            return None
+
+        if self.archive is not None:
+            self.archive.store(employeeURL, section, pageSource)
+        return parsed
+
+    def __loadPage__(self, URL):
+        ''' Loads a page in the browser once the rate controller allows it '''
+        if self.rateController is not None:
+            self.rateController.acquire()
+        self.driver.get(URL)
+
+    def __reportOutcome__(self, succeeded):
+        ''' Reports an extraction to the rate controller; the page of a failed one is checked for a soft block '''
+        self.lastBlock = None
+        if not succeeded:
+            self.lastBlock = DetectSoftBlock(self.driver.current_url, self.driver.page_source)
+
+        if self.rateController is None:
+            return
+        if self.lastBlock is not None:
+            self.rateController.blocked(self.lastBlock)
+        elif succeeded:
+            self.rateController.success()
+
+    def __archiveSection__(self, employeeURL, section):
+        ''' Returns the source of the current page, storing it in the archive if there is one '''
+        pageSource = self.driver.page_source
+        if self.archive is not None:
+            self.archive.store(employeeURL, section, pageSource)
+        return pageSource
+
+    def __waitForElement__(self, XPathLocation, timeout):
+        ''' Waits for an element to be present before a snapshot is taken; the parser reports what is missing '''
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located(
+                    (By.XPATH, XPathLocation)))
+            return True
+        except TimeoutException:
+            return False
 
-    def waitForJStoLoad(self):
-        # From Stack OF; To Do
+    def waitForJStoLoad(self, timeout):
         # See https://stackoverflow.com/questions/10720325/selenium-webdriver-wait-for-complex-page-with-javascript-to-load
-        pass
+        deadline = time.monotonic() + timeout
+        if not self.readiness.waitForDocumentReady(timeout):
+            return False
+        return self.readiness.waitForNetworkIdle(max(deadline - time.monotonic(), 0))
 
 
 '''
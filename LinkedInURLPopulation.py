@@ -1,8 +1,14 @@
-from LinkedInScraper import LinkedInScraper, \
-    DATABASE, USERNAME, PASSWORD, DRIVER_PATH, \
-    WriteLinesToFile, ReadLinesFromFile
+from LinkedInScraper import LinkedInScraper
+from ScraperConfig import CONFIG
+from LinkedInDBAccess import LinkedInDB
+from ScraperMetrics import METRICS, InstrumentScraper, ExportMetrics
+from WorkQueue import WorkQueue, WORK_QUEUE_PATH, EMPLOYEE_URL_QUEUE, QUERY_QUEUE
+from SearchCheckpoint import SearchCheckpoint
+from SessionStore import SessionStore
+from RateController import RateController
 
 import schedule
+import sys
 import time
 
 
@@ -16,24 +22,61 @@ def MakeQueryCombinations(companies, positions, locations):
 
 
 def URLPopulation():
-    # Load queries into memory
-    queries = ReadLinesFromFile("queries.txt")
+    if CONFIG.METRICS_ENABLED:
+        InstrumentScraper(LinkedInScraper, LinkedInDB)
+
+    # Queries are consumed from the query queue (run WorkQueue.py once to import queries.txt)
+    queries = WorkQueue(WORK_QUEUE_PATH, QUERY_QUEUE)
+    queries.recover()
+    employeeURLs = WorkQueue(WORK_QUEUE_PATH, EMPLOYEE_URL_QUEUE)
+    # Last queued results page of each unfinished query
+    checkpoint = SearchCheckpoint(WORK_QUEUE_PATH)
+
+    sessionStore = SessionStore(CONFIG.SESSION_STORE_PATH) if CONFIG.SESSION_STORE_PATH else None
+    username, password = CONFIG.credentials()
+    database = CONFIG.database()
+    # Shared with profile extraction through the persisted state
+    rateController = RateController(WORK_QUEUE_PATH, username, CONFIG.MAX_PAGES_PER_HOUR, CONFIG.MIN_PAGES_PER_HOUR,
+                                    CONFIG.MAX_PAGES_PER_DAY) if CONFIG.RATE_LIMITED else None
 
     # Initialize LinkedInScraper
-    driver = LinkedInScraper(USERNAME, PASSWORD, DRIVER_PATH, DATABASE)
+    driver = LinkedInScraper(username, password, CONFIG.DRIVER_PATH, database, employeeURLs, sessionStore=sessionStore,
+                             rateController=rateController)
+
+    # Additional sessions the pages of each query are spread across
+    helpers = [LinkedInScraper(username, password, CONFIG.DRIVER_PATH, database, employeeURLs,
+                               sessionStore=sessionStore, rateController=rateController)
+               for _ in range(CONFIG.SEARCH_SESSIONS - 1)]
 
     # Extract profiles for each query
-    # If entire queries results are extracted successfully, append employees to file
-    if driver:
-        lastQueryIndex = 0
-        for i, query in enumerate(queries):
-            success = driver.LinkedInPeopleSearch(query, "employeeURLs.txt")
+    # URLs are queued page by page; a query that fails resumes after its last queued page next run
+    if getattr(driver, "driver", None) is not None:
+        query = queries.claim()
+        while query is not None:
+            success = driver.LinkedInPeopleSearch(query, helpers, checkpoint)
             if not success:
-                lastQueryIndex = i
+                # Keep the query (and every query after it) for the next run
+                queries.release(query)
+                METRICS.increment("queries_total", outcome="failed")
                 break
 
-        # Eliminate all successful queries from previous run
-        WriteLinesToFile("queries.txt", queries[lastQueryIndex:])
+            # Eliminate successful queries
+            queries.ack(query)
+            METRICS.increment("queries_total", outcome="ok")
+            query = queries.claim()
+
+    for session in [driver] + helpers:
+        if getattr(session, "driver", None) is not None:
+            session.close()
+
+    queries.close()
+    employeeURLs.close()
+    checkpoint.close()
+    if rateController is not None:
+        print("Rate:", rateController.summary())
+        rateController.close()
+
+    ExportMetrics("URLPopulation")
 
 
 '''
@@ -65,16 +108,22 @@ if USERNAME and PASSWORD != "":
 # Intialization of query combinations
 queries = MakeQueryCombinations(companies, positions, locations)
 WriteLinesToFile("queries.txt", queries)
+WorkQueue(WORK_QUEUE_PATH, QUERY_QUEUE).put(queries)
 '''
 
-schedule.every().day.at("00:00").do(URLPopulation)
-schedule.every().day.at("02:00").do(URLPopulation)
-schedule.every().day.at("22:00").do(URLPopulation)
+# Driver Code
+# Usage: python LinkedInURLPopulation.py [--config scraper.json] [--<setting> value ...]
+if __name__ == "__main__":
+    CONFIG.loadArgs(sys.argv[1:], "Populate the employee URL queue from the query queue")
+
+    schedule.every().day.at("00:00").do(URLPopulation)
+    schedule.every().day.at("02:00").do(URLPopulation)
+    schedule.every().day.at("22:00").do(URLPopulation)
 
-print("Initial Test Run of People Scraper...")
-URLPopulation()
+    print("Initial Test Run of People Scraper...")
+    URLPopulation()
 
-print("Scheduled URLPopulation. Please wait until the scheduled time")
-while True:
-    schedule.run_pending()
-    time.sleep(60)  # wait one minute
+    print("Scheduled URLPopulation. Please wait until the scheduled time")
+    while True:
+        schedule.run_pending()
+        time.sleep(60)  # wait one minute
@@ -0,0 +1,82 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+
+"""
+PageArchive
+
+Description:
+    Local SQLite archive of the rendered HTML of each profile section.
+    Every fetch is recorded by (URL, section, fetch time), while the HTML itself is zlib
+    compressed and stored once per content hash, so unchanged pages cost one row each.
+    Lets profiles be re-parsed after a selector fix without fetching them from LinkedIn again.
+"""
+
+# Sections archived for each profile, named after the /details/* page they come from
+PROFILE = "profile"
+EXPERIENCE = "experience"
+EDUCATION = "education"
+SKILLS = "skills"
+SECTIONS = (PROFILE, EXPERIENCE, EDUCATION, SKILLS)
+
+
+class PageArchive:
+    def __init__(self, path):
+        self.path = path
+        # Shared by every scraper session in the process
+        self.__lock__ = threading.Lock()
+        self.__connection__ = sqlite3.connect(path, check_same_thread=False)
+        self.__createTables__()
+
+    def __createTables__(self):
+        with self.__lock__, self.__connection__:
+            self.__connection__.execute(
+                "CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, data BLOB NOT NULL)")
+            self.__connection__.execute(
+                "CREATE TABLE IF NOT EXISTS pages (id INTEGER PRIMARY KEY, url TEXT NOT NULL, "
+                "section TEXT NOT NULL, fetched_at REAL NOT NULL, hash TEXT NOT NULL REFERENCES blobs(hash))")
+            self.__connection__.execute(
+                "CREATE INDEX IF NOT EXISTS pages_url_section ON pages (url, section, fetched_at)")
+
+    def store(self, url, section, pageSource, fetchedAt=None):
+        ''' Records a fetch of a section and returns the content hash of its HTML '''
+        data = pageSource.encode("utf-8")
+        contentHash = hashlib.sha256(data).hexdigest()
+
+        if fetchedAt is None:
+            fetchedAt = time.time()
+
+        with self.__lock__, self.__connection__:
+            self.__connection__.execute("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)",
+                                        (contentHash, zlib.compress(data)))
+            self.__connection__.execute("INSERT INTO pages (url, section, fetched_at, hash) VALUES (?, ?, ?, ?)",
+                                        (url, section, fetchedAt, contentHash))
+
+        return contentHash
+
+    def latest(self, url, section):
+        ''' Returns the HTML of the most recent fetch of a section, or None if it was never archived '''
+        with self.__lock__:
+            row = self.__connection__.execute(
+                "SELECT blobs.data FROM pages JOIN blobs ON blobs.hash = pages.hash "
+                "WHERE pages.url = ? AND pages.section = ? ORDER BY pages.fetched_at DESC LIMIT 1",
+                (url, section)).fetchone()
+
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def urls(self):
+        ''' URLs with every section archived, in the order they were first archived '''
+        with self.__lock__:
+            rows = self.__connection__.execute(
+                "SELECT url FROM pages GROUP BY url HAVING COUNT(DISTINCT section) = ? ORDER BY MIN(id)",
+                (len(SECTIONS),)).fetchall()
+
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self.__lock__:
+            self.__connection__.close()
@@ -0,0 +1,98 @@
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.wait import WebDriverWait
+
+import time
+
+"""
+PageReadiness
+
+Description:
+    Event-driven replacement for fixed sleeps while a LinkedIn page renders.
+    Each wait polls the browser and returns as soon as its condition holds, or gives up at its deadline.
+    Waits return True/False (or the elements found) instead of raising, so callers decide what is fatal.
+"""
+
+# How often the browser is polled
+POLL_INTERVAL = 0.1
+# How long a condition has to hold before the page (or list) is considered settled
+SETTLE_TIME = 0.5
+
+
+class PageReadiness:
+    def __init__(self, driver, pollInterval=POLL_INTERVAL, settleTime=SETTLE_TIME):
+        self.driver = driver
+        self.pollInterval = pollInterval
+        self.settleTime = settleTime
+
+    def waitForDocumentReady(self, timeout):
+        ''' Waits for the document (not its XHRs) to finish loading '''
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=self.pollInterval).until(
+                lambda driver: driver.execute_script("return document.readyState") == "complete")
+            return True
+        except TimeoutException:
+            return False
+
+    def waitForNetworkIdle(self, timeout):
+        ''' Waits until no new resource has finished loading for settleTime '''
+        return self.__waitUntilSettled__(
+            lambda: self.driver.execute_script(
+                "return window.performance.getEntriesByType('resource').length"),
+            timeout) is not None
+
+    def waitForStableList(self, parent, XPathLocation, timeout):
+        '''
+        Waits for the elements at XPathLocation (relative to parent, the driver by default)
+        to be present and for their count to stop changing. Returns them, or None at the deadline.
+        '''
+        if parent is None:
+            parent = self.driver
+
+        elements = []
+
+        def count():
+            elements[:] = parent.find_elements(By.XPATH, XPathLocation)
+            # An empty list is never settled, keep waiting for it to render
+            return len(elements) or None
+
+        if self.__waitUntilSettled__(count, timeout) is None:
+            return None
+        return list(elements)
+
+    def waitForSection(self, XPathLocation, timeout, parent=None):
+        ''' Document ready, network idle, then a stable target list, all within one deadline '''
+        deadline = time.monotonic() + timeout
+
+        self.waitForDocumentReady(self.__remaining__(deadline))
+        self.waitForNetworkIdle(self.__remaining__(deadline))
+
+        return self.waitForStableList(parent, XPathLocation, self.__remaining__(deadline))
+
+    def __remaining__(self, deadline):
+        return max(deadline - time.monotonic(), 0)
+
+    def __waitUntilSettled__(self, probe, timeout):
+        # Returns the probed value once it is unchanged for settleTime, or None at the deadline
+        deadline = time.monotonic() + timeout
+        lastValue = None
+        settledSince = None
+
+        while True:
+            try:
+                value = probe()
+            except StaleElementReferenceException:
+                # The parent was re-rendered; start settling again
+                value = None
+
+            now = time.monotonic()
+            if value is None or value != lastValue:
+                lastValue = value
+                settledSince = now
+            elif now - settledSince >= self.settleTime:
+                return value
+
+            if now >= deadline:
+                return None
+
+            time.sleep(self.pollInterval)
@@ -0,0 +1,103 @@
+import queue
+import threading
+
+from LinkedInDBAccess import LinkedInDB
+
+"""
+PersistPipeline
+
+Description:
+    Decouples scraping from persistence. Scraped employees are pushed into a bounded in-memory
+    queue and a background writer inserts them in batches, one transaction per batch, so the
+    browser keeps scraping while the database writes.
+    put() blocks while the queue is full (backpressure when the database is slower than the
+    scrapers) and close() flushes everything still queued before returning.
+"""
+
+# Employees inserted per transaction
+PERSIST_BATCH_SIZE = 25
+# Employees that may wait for the writer before put() blocks
+PERSIST_QUEUE_SIZE = 100
+# A partial batch is written after waiting this long for it to fill up (seconds)
+PERSIST_FLUSH_INTERVAL = 5.0
+
+# Marks the end of the stream for the writer
+__CLOSE__ = object()
+
+
+class PersistPipeline:
+    def __init__(self, database: LinkedInDB, batchSize=PERSIST_BATCH_SIZE, maxQueued=PERSIST_QUEUE_SIZE,
+                 flushInterval=PERSIST_FLUSH_INTERVAL, onInserted=None, onFailed=None):
+        self.database = database
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+
+        # Called from the writer thread with the key passed to put(); onFailed also gets whether the
+        # database rejected the employee (False when the database was unavailable)
+        self.onInserted = onInserted
+        self.onFailed = onFailed
+
+        self.inserted = 0
+        self.failed = 0
+
+        self.__queue__ = queue.Queue(maxsize=maxQueued)
+        self.__writer__ = threading.Thread(target=self.__run__, daemon=True)
+        self.__writer__.start()
+
+    def put(self, key, employee):
+        ''' Queues an employee for insertion, blocking while the queue is full '''
+        self.__queue__.put((key, employee))
+
+    def close(self):
+        ''' Writes everything still queued and stops the writer '''
+        self.__queue__.put(__CLOSE__)
+        self.__writer__.join()
+
+    def __run__(self):
+        batch = []
+        closed = False
+        while not closed:
+            try:
+                item = self.__queue__.get(timeout=self.flushInterval)
+            except queue.Empty:
+                item = None
+
+            if item is __CLOSE__:
+                closed = True
+            elif item is not None:
+                batch.append(item)
+
+            # Write full batches right away, partial ones when the scrapers go quiet or on close
+            if batch and (len(batch) >= self.batchSize or item is None or closed):
+                self.__write__(batch)
+                batch = []
+
+    def __write__(self, batch):
+        # Employees the database rejected, and those it could not be asked about because it was unavailable
+        rejectedIds = set()
+        unavailableIds = set()
+        try:
+            rejectedIds = set(id(employee) for employee in
+                              self.database.insertEmployees([employee for _, employee in batch]))
+        except Exception as error:
+            # The database itself is unavailable; whatever wasn't committed or rejected before that failed
+            print("ERROR: Could not write batch:", error)
+            committedIds = set(id(employee) for employee in getattr(error, "committed", []))
+            rejectedIds = set(id(employee) for employee in getattr(error, "rejected", []))
+            unavailableIds = set(id(employee) for _, employee in batch) - committedIds - rejectedIds
+
+        for key, employee in batch:
+            if id(employee) in rejectedIds or id(employee) in unavailableIds:
+                self.failed += 1
+                callback = self.onFailed
+                arguments = (key, id(employee) in rejectedIds)
+            else:
+                self.inserted += 1
+                callback = self.onInserted
+                arguments = (key,)
+
+            if callback is not None:
+                try:
+                    callback(*arguments)
+                except Exception as error:
+                    print("ERROR: Pipeline callback failed for", key, error)
@@ -0,0 +1,138 @@
+import json
+import sys
+
+from WorkQueue import WorkQueue, WORK_QUEUE_PATH, QUERY_QUEUE
+
+"""
+QueryPlanner
+
+Description:
+    Builds a reduced, prioritized list of people-search queries instead of the full
+    company x position x location cartesian product of MakeQueryCombinations.
+    Terms listed in the same synonym group return heavily overlapping results, so only the
+    first term of each group is searched. Terms contained in a broader term that is also
+    searched (e.g. "San Jose, CA" in "San Francisco Bay Area") are dropped.
+    Each query gets an estimated yield (new profiles) from per-term weights, and the plan is
+    ordered by it so the most productive searches run first.
+
+Config (JSON), every key but the term lists being optional:
+    {
+        "companies": [...], "positions": [...], "locations": [...],
+        "synonyms": {"positions": [["Software Engineer", "SWE", ...], ...], ...},
+        "containment": {"locations": {"San Francisco Bay Area": ["San Jose, CA", ...]}, ...},
+        "weights": {"companies": {"Amazon": 3.0}, ...},
+        "baseYield": 100,
+        "maxResultsPerQuery": 1000
+    }
+"""
+
+DIMENSIONS = ("companies", "positions", "locations")
+
+# LinkedIn stops at 100 pages of 10 results
+MAX_RESULTS_PER_QUERY = 1000
+# Estimated new profiles for a query made of terms of weight 1
+BASE_YIELD = 100
+
+
+def ReduceTerms(terms, synonymGroups, containment, weights):
+    '''
+    Collapses synonyms and contained terms.
+    Returns (term, weight) pairs; a kept term's weight is the largest among the terms it stands for.
+    '''
+    canonical = {}
+    for group in synonymGroups:
+        for term in group:
+            canonical[term] = group[0]
+
+    # A term is dropped if its container (or the container's canonical form) is searched
+    searched = set(canonical.get(term, term) for term in terms)
+    containedBy = {}
+    for container, members in containment.items():
+        container = canonical.get(container, container)
+        if container in searched:
+            for member in members:
+                containedBy[canonical.get(member, member)] = container
+
+    reduced = {}
+    for term in terms:
+        kept = canonical.get(term, term)
+        # Follow nested containment up to the broadest searched term (guarding against cycles)
+        seen = set()
+        while kept in containedBy and kept not in seen:
+            seen.add(kept)
+            kept = containedBy[kept]
+
+        weight = weights.get(term, 1.0)
+        # Dicts keep the order the kept terms first appeared in
+        reduced[kept] = max(reduced.get(kept, 0.0), weight, weights.get(kept, 0.0))
+
+    return list(reduced.items())
+
+
+def PlanQueries(config):
+    ''' Returns (query, estimatedYield) pairs, highest estimated yield first '''
+    synonyms = config.get("synonyms", {})
+    containment = config.get("containment", {})
+    weights = config.get("weights", {})
+    baseYield = config.get("baseYield", BASE_YIELD)
+    maxResults = config.get("maxResultsPerQuery", MAX_RESULTS_PER_QUERY)
+
+    companies, positions, locations = [
+        ReduceTerms(config[dimension], synonyms.get(dimension, []),
+                    containment.get(dimension, {}), weights.get(dimension, {}))
+        for dimension in DIMENSIONS]
+
+    plan = []
+    for company, companyWeight in companies:
+        for position, positionWeight in positions:
+            for location, locationWeight in locations:
+                estimatedYield = min(baseYield * companyWeight * positionWeight * locationWeight, maxResults)
+                plan.append((company + " " + position + " " + location, estimatedYield))
+
+    # sorted() is stable, so ties keep the company/position/location order
+    return sorted(plan, key=lambda entry: entry[1], reverse=True)
+
+
+def WritePlan(plan, queriesFilePath=None, workQueue: WorkQueue = None):
+    '''
+    Writes the plan in the formats URLPopulation consumes: queries.txt lines and/or the query queue,
+    whose pending queries become exactly the plan, in plan order. Returns (added, removed).
+    '''
+    queries = [query for query, _ in plan]
+
+    if queriesFilePath is not None:
+        with open(queriesFilePath, "w") as file:
+            for query in queries:
+                file.write(query + '\n')
+
+    if workQueue is not None:
+        # The plan replaces whatever was pending (e.g. the full cartesian queries.txt import)
+        return workQueue.replacePending(queries)
+
+    return len(queries), 0
+
+
+# Driver Code
+# Usage: python QueryPlanner.py [queryPlanner.json] [queries.txt]
+if __name__ == "__main__":
+    configPath = sys.argv[1] if len(sys.argv) > 1 else "queryPlanner.json"
+    queriesFilePath = sys.argv[2] if len(sys.argv) > 2 else "queries.txt"
+
+    with open(configPath, "r") as file:
+        config = json.load(file)
+
+    plan = PlanQueries(config)
+
+    fullProduct = 1
+    for dimension in DIMENSIONS:
+        fullProduct *= len(config[dimension])
+
+    print(len(plan), "queries planned instead of", fullProduct)
+    print("Estimated yield:", int(sum(estimatedYield for _, estimatedYield in plan)), "profiles")
+    for query, estimatedYield in plan[:10]:
+        print(f"     {estimatedYield:8.0f}  {query}")
+
+    workQueue = WorkQueue(WORK_QUEUE_PATH, QUERY_QUEUE)
+    added, removed = WritePlan(plan, queriesFilePath, workQueue)
+    workQueue.close()
+    print(added, "new queries added to the query queue,", removed, "pruned queries removed")
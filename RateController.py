@@ -0,0 +1,220 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from lxml import etree
+from lxml import html as lxmlHTML
+
+"""
+RateController
+
+Description:
+    Paces the page loads of every scraper session of a LinkedIn account. A token bucket refills at
+    the current rate (pages per hour) and each page load takes one token, so loads are spread out
+    evenly instead of bunched into the scheduled slots. The rate is adjusted AIMD style: it grows
+    by a fixed step after every window of clean extractions and is cut by a factor as soon as a soft
+    block is detected (captcha, auth wall, empty <main>, HTTP 429), followed by a cooldown that
+    doubles with each consecutive block. The rate never leaves [minPagesPerHour, maxPagesPerHour]
+    and no more than maxPagesPerDay pages are loaded per day.
+
+    The state (rate, cooldown, pages loaded today) is persisted per account next to the work queues
+    and synced every few pages, so people searches and profile extraction share it across runs and
+    processes, and a run starts at the rate the previous one ended at.
+"""
+
+# Soft blocks
+CAPTCHA = "captcha"
+AUTHWALL = "authwall"
+EMPTY_PAGE = "empty_page"
+THROTTLED = "throttled"
+
+# Politeness limits
+MAX_PAGES_PER_HOUR = 360
+MIN_PAGES_PER_HOUR = 30
+MAX_PAGES_PER_DAY = 2500
+# Pages that can be loaded back to back after an idle period
+BURST = 3
+
+# Pages per hour added after every INCREASE_WINDOW clean extractions
+RATE_INCREASE = 20
+INCREASE_WINDOW = 10
+# Factor the rate is multiplied by on a block
+RATE_DECREASE = 0.5
+
+# Seconds of the first cooldown, doubled with every consecutive block
+COOLDOWN = 60
+MAX_COOLDOWN = 3600
+
+# Pages loaded between syncs with the persisted state
+SYNC_EVERY = 10
+
+__CAPTCHA_PATHS__ = ("/checkpoint/challenge",)
+__AUTHWALL_PATHS__ = ("/authwall", "/login", "/uas/login", "/checkpoint")
+__CAPTCHA__ = re.compile(r'id="captcha|class="g-recaptcha|recaptcha/api')
+
+
+def DetectSoftBlock(URL, pageSource):
+    ''' Returns the soft block a loaded page shows (CAPTCHA, AUTHWALL or EMPTY_PAGE), or None '''
+    path = urlsplit(URL).path
+    if path.startswith(__CAPTCHA_PATHS__) or (pageSource and __CAPTCHA__.search(pageSource)):
+        return CAPTCHA
+    if path.startswith(__AUTHWALL_PATHS__):
+        return AUTHWALL
+
+    if not pageSource or not pageSource.strip():
+        return EMPTY_PAGE
+    try:
+        main = lxmlHTML.fromstring(pageSource).find(".//main")
+    except (etree.ParserError, ValueError):
+        return EMPTY_PAGE
+    if main is None or not main.text_content().strip():
+        return EMPTY_PAGE
+
+    return None
+
+
+class RateController:
+    def __init__(self, path, name, maxPagesPerHour=MAX_PAGES_PER_HOUR, minPagesPerHour=MIN_PAGES_PER_HOUR,
+                 maxPagesPerDay=MAX_PAGES_PER_DAY, burst=BURST):
+        self.path = path
+        # State is kept per account
+        self.name = name
+        self.maxPagesPerHour = maxPagesPerHour
+        self.minPagesPerHour = minPagesPerHour
+        self.maxPagesPerDay = maxPagesPerDay
+        self.burst = burst
+
+        self.rate = maxPagesPerHour / 2
+        self.tokens = 1
+        self.__refilledAt__ = time.monotonic()
+        self.blockedUntil = 0
+        self.consecutiveBlocks = 0
+        self.__cleanExtractions__ = 0
+
+        self.day = time.strftime("%Y-%m-%d")
+        # Loaded today by every process, as of the last sync, plus this process' pages since
+        self.pagesToday = 0
+        self.__unsyncedPages__ = 0
+
+        # This run
+        self.pages = 0
+        self.blocks = Counter()
+
+        # Shared by every session of the process
+        self.__lock__ = threading.RLock()
+        self.__connection__ = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self.__lock__:
+            self.__connection__.execute(
+                "CREATE TABLE IF NOT EXISTS rate_state (name TEXT PRIMARY KEY, rate REAL NOT NULL, "
+                "blocked_until REAL NOT NULL, consecutive_blocks INTEGER NOT NULL, day TEXT NOT NULL, "
+                "pages_today INTEGER NOT NULL, updated_at REAL NOT NULL)")
+            self.__sync__(resume=True)
+
+    def __sync__(self, resume=False):
+        ''' Merges the persisted state with this process' and writes it back '''
+        self.__connection__.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.__connection__.execute(
+                "SELECT rate, blocked_until, consecutive_blocks, day, pages_today FROM rate_state WHERE name = ?",
+                (self.name,)).fetchone()
+
+            today = time.strftime("%Y-%m-%d")
+            if today != self.day:
+                self.day = today
+                self.__unsyncedPages__ = 0
+
+            storedPages = 0
+            if row is not None:
+                rate, blockedUntil, consecutiveBlocks, day, pages = row
+                storedPages = pages if day == today else 0
+                # Resume where the last run stopped, and follow blocks seen by other processes
+                if resume or blockedUntil > self.blockedUntil:
+                    self.rate = min(max(rate, self.minPagesPerHour), self.maxPagesPerHour)
+                    self.blockedUntil = max(self.blockedUntil, blockedUntil)
+                    self.consecutiveBlocks = consecutiveBlocks
+
+            self.pagesToday = storedPages + self.__unsyncedPages__
+            self.__unsyncedPages__ = 0
+
+            self.__connection__.execute(
+                "INSERT OR REPLACE INTO rate_state (name, rate, blocked_until, consecutive_blocks, day, "
+                "pages_today, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.name, self.rate, self.blockedUntil, self.consecutiveBlocks, self.day, self.pagesToday,
+                 time.time()))
+            self.__connection__.execute("COMMIT")
+        except BaseException:
+            self.__connection__.execute("ROLLBACK")
+            raise
+
+    def exhausted(self):
+        ''' True once the daily page budget is used up '''
+        with self.__lock__:
+            if time.strftime("%Y-%m-%d") != self.day:
+                self.__sync__()
+            return self.pagesToday >= self.maxPagesPerDay
+
+    def acquire(self):
+        ''' Waits until the next page may be loaded (through the cooldown of a block, if any) '''
+        while True:
+            with self.__lock__:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.__refilledAt__) * self.rate / 3600)
+                self.__refilledAt__ = now
+
+                wait = self.blockedUntil - time.time()
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.pages += 1
+                        self.pagesToday += 1
+                        self.__unsyncedPages__ += 1
+                        if self.__unsyncedPages__ >= SYNC_EVERY:
+                            self.__sync__()
+                        return
+                    wait = (1 - self.tokens) * 3600 / self.rate
+
+            time.sleep(wait)
+
+    def success(self):
+        ''' Reports an extraction (a profile, a search page) that completed without a block '''
+        with self.__lock__:
+            self.consecutiveBlocks = 0
+            self.__cleanExtractions__ += 1
+            if self.__cleanExtractions__ >= INCREASE_WINDOW:
+                self.__cleanExtractions__ = 0
+                self.rate = min(self.rate + RATE_INCREASE, self.maxPagesPerHour)
+
+    def blocked(self, reason, retryAfter=None):
+        ''' Reports a soft block: cuts the rate and pauses every session for a cooldown '''
+        with self.__lock__:
+            self.blocks[reason] += 1
+            now = time.time()
+            # Blocks reported during a cooldown come from pages loaded before it started
+            if now < self.blockedUntil:
+                return
+
+            self.consecutiveBlocks += 1
+            self.rate = max(self.rate * RATE_DECREASE, self.minPagesPerHour)
+            self.tokens = 0
+            self.__cleanExtractions__ = 0
+
+            cooldown = retryAfter if retryAfter else min(COOLDOWN * 2 ** (self.consecutiveBlocks - 1),
+                                                         MAX_COOLDOWN)
+            self.blockedUntil = now + cooldown
+            print("WARNING: Soft block (" + reason + "), pausing for", round(cooldown), "s at",
+                  round(self.rate), "pages per hour")
+            self.__sync__()
+
+    def summary(self):
+        with self.__lock__:
+            return {"pages": self.pages, "pages_today": self.pagesToday, "pages_per_hour": round(self.rate),
+                    "blocks": dict(self.blocks)}
+
+    def close(self):
+        with self.__lock__:
+            self.__sync__()
+            self.__connection__.close()
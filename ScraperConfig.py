@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import sys
+import threading
+
+"""
+ScraperConfig
+
+Description:
+    Settings of the scraper and its entry points, resolved lazily on first use so that importing
+    any module stays free of file reads, database engines and credentials.
+    Each setting is taken from, in increasing priority:
+        the defaults below
+        the JSON config file (scraper.json, or the file named by LINKEDIN_CONFIG / --config)
+        LINKEDIN_<SETTING> environment variables (e.g. LINKEDIN_SCRAPER_WORKERS=4)
+        command line options of the entry points (e.g. --scraper-workers 4)
+    Credentials come from LINKEDIN_USERNAME/LINKEDIN_PASSWORD (LINKEDIN_DATABASE_USERNAME/..._PASSWORD)
+    or, as before, from creds.txt (dbcreds.txt), and the database is only created by CONFIG.database().
+"""
+
+# How the profile detail sections are parsed
+# LIVE_DOM: one WebDriver find_element round trip per field
+# SNAPSHOT: one page_source round trip per section, parsed in-process by LinkedInPageParser
+LIVE_DOM = "live"
+SNAPSHOT = "snapshot"
+
+CONFIG_PATH = "scraper.json"
+CONFIG_PATH_VARIABLE = "LINKEDIN_CONFIG"
+ENVIRONMENT_PREFIX = "LINKEDIN_"
+
+# Setting -> (type, default, description)
+SETTINGS = {
+    "DRIVER_PATH": (str, "/Users/danieljo/LinkedInScraper/chromedriver", "Path of chromedriver"),
+    "CREDENTIALS_PATH": (str, "creds.txt", "File with the LinkedIn username and password (one per line)"),
+    "DATABASE_CREDENTIALS_PATH": (str, "dbcreds.txt", "File with the database username and password"),
+    "DATABASE_NAME": (str, "linkedin", "MySQL database"),
+    "HOST": (str, "10.33.113.250", "MySQL host"),
+    "PORT": (int, 3308, "MySQL port"),
+    "DATABASE_URL": (str, None, "SQLAlchemy URL replacing the MySQL server (e.g. sqlite:///linkedin.db)"),
+    "SCRAPER_WORKERS": (int, 1, "Concurrent scraper sessions (headless Chrome instances) extracting profiles"),
+    "SEARCH_SESSIONS": (int, 1, "Scraper sessions the pages of each people search are spread across"),
+    "SCRAPER_PARSER": (str, LIVE_DOM, f"How profile sections are parsed: {LIVE_DOM} or {SNAPSHOT}"),
+    "URL_INDEX_BLOOM": (bool, False, "Index the profiles in the database in a Bloom filter instead of a set"),
+    "URL_INDEX_CAPACITY": (int, 5000000, "Profiles the Bloom filter is sized for"),
+    "URL_INDEX_PATH": (str, None, "File the Bloom filter is memory-mapped from (in memory if unset)"),
+    "METRICS_ENABLED": (bool, False, "Record per-stage timings and counters, exported to metrics/"),
+    "ARCHIVE_PATH": (str, None, "SQLite file archiving the HTML of every scraped profile section"),
+    "LEAN_BROWSER": (bool, True, "Start Chrome without images, fonts, video and trackers"),
+    "MEASURE_PAGE_LOADS": (bool, False, "Record bytes transferred and load time of every page"),
+    "SESSION_STORE_PATH": (str, "session.store", "Encrypted store of the saved browser session (unset to disable)"),
+    "INTERACTIVE_LOGIN": (bool, None, "Prompt for the login PIN (default: when run from a terminal)"),
+    "HTTP_FETCH": (bool, False, "Fetch server-rendered profile pages over HTTP with the session cookies"),
+    "HTTP_BASE_URL": (str, "https://www.linkedin.com", "Where those pages are fetched from"),
+    # Off unless enabled, so existing setups keep the throughput of their SCRAPER_WORKERS
+    "RATE_LIMITED": (bool, False, "Pace page loads with the adaptive rate controller; its limits are shared by "
+                                  "every session of the account, so the whole worker pool gets one budget"),
+    "MAX_PAGES_PER_HOUR": (int, 360, "Highest rate the rate controller may reach (all sessions together)"),
+    "MIN_PAGES_PER_HOUR": (int, 30, "Lowest rate the rate controller backs off to"),
+    "MAX_PAGES_PER_DAY": (int, 2500, "Pages loaded per day and account, across runs"),
+    "REFRESH_AFTER_DAYS": (int, 30, "Age after which a profile in the database is refreshed"),
+    "REFRESH_BATCH_SIZE": (int, 200, "Stalest profiles refreshed per run"),
+}
+
+
+def GetUsernameAndPassword(textFilePath):
+    # Text file format
+    # username
+    # password
+    username = ""
+    password = ""
+    try:
+        with open(textFilePath, "r") as file:
+            username = file.readline().strip()
+            password = file.readline().strip()
+    except FileNotFoundError:
+        print("ERROR:", textFilePath, "was not found")
+
+    return username, password
+
+
+def __convert__(name, value):
+    settingType = SETTINGS[name][0]
+    if value is None or isinstance(value, settingType):
+        return value
+    if not isinstance(value, str):
+        return settingType(value)
+
+    if value.strip().lower() in ("", "none", "null"):
+        return None
+    if settingType is bool:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return settingType(value)
+
+
+class ScraperConfig:
+    def __init__(self, path=None, environ=None):
+        self.__path__ = path
+        self.__environ__ = os.environ if environ is None else environ
+        self.__overrides__ = {}
+        self.__values__ = None
+        self.__credentials__ = {}
+        self.__database__ = None
+        self.__lock__ = threading.RLock()
+
+    def __getattr__(self, name):
+        if name not in SETTINGS:
+            raise AttributeError(f"No setting named {name}")
+        return self.__resolve__()[name]
+
+    def __contains__(self, name):
+        return name in SETTINGS
+
+    def __resolve__(self):
+        with self.__lock__:
+            if self.__values__ is not None:
+                return self.__values__
+
+            values = {name: default for name, (_, default, _) in SETTINGS.items()}
+
+            path = self.__path__ or self.__environ__.get(CONFIG_PATH_VARIABLE) or CONFIG_PATH
+            try:
+                with open(path, "r") as file:
+                    for name, value in json.load(file).items():
+                        if name.upper() not in SETTINGS:
+                            print("WARNING: Unknown setting", name, "in", path)
+                            continue
+                        values[name.upper()] = __convert__(name.upper(), value)
+            except FileNotFoundError:
+                if self.__path__ or self.__environ__.get(CONFIG_PATH_VARIABLE):
+                    print("ERROR:", path, "was not found")
+
+            for name in SETTINGS:
+                if ENVIRONMENT_PREFIX + name in self.__environ__:
+                    values[name] = __convert__(name, self.__environ__[ENVIRONMENT_PREFIX + name])
+
+            values.update(self.__overrides__)
+
+            if values["INTERACTIVE_LOGIN"] is None:
+                values["INTERACTIVE_LOGIN"] = sys.stdin is not None and sys.stdin.isatty()
+
+            self.__values__ = values
+            return values
+
+    def set(self, **settings):
+        ''' Overrides settings (highest priority); must happen before the database is created '''
+        with self.__lock__:
+            for name, value in settings.items():
+                if name not in SETTINGS:
+                    raise AttributeError(f"No setting named {name}")
+                self.__overrides__[name] = __convert__(name, value)
+            self.__values__ = None
+
+    def loadArgs(self, argv=None, description=None):
+        ''' Applies --config and --<setting> command line options; returns the parsed arguments '''
+        parser = argparse.ArgumentParser(description=description)
+        parser.add_argument("--config", help=f"JSON config file (default: {CONFIG_PATH})")
+        for name, (_, default, help) in SETTINGS.items():
+            parser.add_argument("--" + name.lower().replace("_", "-"), dest=name, help=f"{help} (default: {default})")
+        args = parser.parse_args(argv)
+
+        with self.__lock__:
+            if args.config:
+                self.__path__ = args.config
+            self.set(**{name: getattr(args, name) for name in SETTINGS if getattr(args, name) is not None})
+        return args
+
+    def credentials(self):
+        ''' (username, password) of the LinkedIn account '''
+        return self.__loadCredentials__("", self.CREDENTIALS_PATH)
+
+    def databaseCredentials(self):
+        ''' (username, password) of the database '''
+        return self.__loadCredentials__("DATABASE_", self.DATABASE_CREDENTIALS_PATH)
+
+    def __loadCredentials__(self, prefix, path):
+        with self.__lock__:
+            if prefix not in self.__credentials__:
+                username = self.__environ__.get(ENVIRONMENT_PREFIX + prefix + "USERNAME")
+                password = self.__environ__.get(ENVIRONMENT_PREFIX + prefix + "PASSWORD")
+                if username is None or password is None:
+                    # Either change driver code, or create the file in the working directory
+                    username, password = GetUsernameAndPassword(path)
+                self.__credentials__[prefix] = (username, password)
+            return self.__credentials__[prefix]
+
+    def database(self):
+        ''' The process-wide LinkedInDB, created on first use '''
+        with self.__lock__:
+            if self.__database__ is None:
+                from LinkedInDBAccess import LinkedInDB
+
+                if self.DATABASE_URL:
+                    self.__database__ = LinkedInDB(self.DATABASE_NAME, None, None, None, None, url=self.DATABASE_URL)
+                else:
+                    user, password = self.databaseCredentials()
+                    self.__database__ = LinkedInDB(self.DATABASE_NAME, self.HOST, self.PORT, user, password)
+            return self.__database__
+
+
+# Process-wide configuration shared by every module
+CONFIG = ScraperConfig()
@@ -0,0 +1,246 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+"""
+ScraperMetrics
+
+Description:
+    Lightweight per-stage timing, counters and histograms for the scraper.
+    InstrumentScraper wraps the LinkedInScraper and LinkedInDB methods (and the Selenium lookups
+    they make) with timers. Nothing is wrapped unless it is called, and every recording call
+    returns immediately while the registry is disabled, so the overhead is negligible when off.
+    ExportMetrics writes a Prometheus text-format file and appends to a rolling JSON summary.
+"""
+
+METRICS_DIRECTORY = "metrics"
+# Runs kept in the rolling JSON summary
+SUMMARY_RUNS = 50
+
+# Upper bounds (seconds) of the stage duration histogram buckets
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Methods timed by InstrumentScraper, with the stage name they are recorded under
+SCRAPER_STAGES = {
+    "__init__": "login",
+    "LinkedInPeopleSearch": "people_search",
+    "ReadSearchPageCount": "search_page_count",
+    "CollectEmployeeURLsFromSearchPage": "search_page",
+    "ExtractProfileAttributes": "profile",
+    "ExtractEmployeeExperiences": "experience",
+    "ExtractEmployeeEducation": "education",
+    "ExtractEmployeeSkills": "skills",
+    "waitForJStoLoad": "skills_wait",
+}
+DATABASE_STAGES = {
+    "insertEmployees": "insert_employees",
+    "warmCaches": "warm_caches",
+    "syncEmployeeURLs": "sync_employee_urls",
+}
+
+
+class Histogram:
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def summary(self):
+        return {"count": self.count, "sum": round(self.sum, 6),
+                "mean": round(self.sum / self.count, 6) if self.count else 0.0}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self.__lock__ = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # Keyed by (name, ((label, value), ...))
+        self.counters = {}
+        self.histograms = {}
+        self.startedAt = time.time()
+
+    def increment(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock__:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.__lock__:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage):
+        if not self.enabled:
+            yield
+            return
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - began, stage=stage)
+
+    def prometheusText(self, prefix="linkedin_scraper"):
+        def formatLabels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{label}="{value}"' for label, value in pairs) + "}"
+
+        lines = []
+        with self.__lock__:
+            for name in sorted(set(name for name, _ in self.counters)):
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (counterName, labels), value in sorted(self.counters.items()):
+                    if counterName == name:
+                        lines.append(f"{prefix}_{name}{formatLabels(labels)} {value}")
+
+            for name in sorted(set(name for name, _ in self.histograms)):
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for (histogramName, labels), histogram in sorted(self.histograms.items()):
+                    if histogramName != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{prefix}_{name}_bucket{formatLabels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{prefix}_{name}_bucket{formatLabels(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{prefix}_{name}_sum{formatLabels(labels)} {histogram.sum}")
+                    lines.append(f"{prefix}_{name}_count{formatLabels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self, run):
+        def labelled(name, labels):
+            return name + "".join(f"[{label}={value}]" for label, value in labels)
+
+        with self.__lock__:
+            return {
+                "run": run,
+                "started_at": self.startedAt,
+                "finished_at": time.time(),
+                "counters": {labelled(name, labels): value for (name, labels), value in sorted(self.counters.items())},
+                "histograms": {labelled(name, labels): histogram.summary()
+                               for (name, labels), histogram in sorted(self.histograms.items())},
+            }
+
+
+# Process-wide registry shared by every scraper session
+METRICS = MetricsRegistry()
+
+
+def Timed(stage, method):
+    ''' Wraps method so that each call is recorded as a duration of stage '''
+    @functools.wraps(method)
+    def timedMethod(*args, **kwargs):
+        if not METRICS.enabled:
+            return method(*args, **kwargs)
+        with METRICS.timer(stage):
+            return method(*args, **kwargs)
+
+    timedMethod.__timed__ = True
+    return timedMethod
+
+
+def Instrument(cls, stages):
+    for methodName, stage in stages.items():
+        method = getattr(cls, methodName, None)
+        if method is not None and not getattr(method, "__timed__", False):
+            setattr(cls, methodName, Timed(stage, method))
+
+
+# Set while a WebDriverWait polls, whose misses are expected and only its final timeout counts
+__waiting__ = threading.local()
+
+
+def __countingLookups__(method, name):
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+    @functools.wraps(method)
+    def countedMethod(*args, **kwargs):
+        if not METRICS.enabled:
+            return method(*args, **kwargs)
+        outerWait = name == "wait" and not getattr(__waiting__, "active", False)
+        if outerWait:
+            __waiting__.active = True
+        try:
+            return method(*args, **kwargs)
+        except NoSuchElementException:
+            if not getattr(__waiting__, "active", False):
+                METRICS.increment("no_such_element_total")
+            raise
+        except TimeoutException:
+            METRICS.increment("timeouts_total")
+            raise
+        finally:
+            if outerWait:
+                __waiting__.active = False
+            METRICS.increment("webdriver_calls_total", call=name)
+
+    countedMethod.__timed__ = True
+    return countedMethod
+
+
+def InstrumentScraper(scraperClass, databaseClass):
+    ''' Enables the registry and wraps the scraper, database and Selenium methods (once per process) '''
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    METRICS.enabled = True
+
+    Instrument(scraperClass, SCRAPER_STAGES)
+    Instrument(databaseClass, DATABASE_STAGES)
+
+    # Each call is a round trip to chromedriver
+    if not getattr(WebDriver.get, "__timed__", False):
+        WebDriver.get = Timed("navigation", WebDriver.get)
+    for cls in (WebDriver, WebElement):
+        if not getattr(cls.find_element, "__timed__", False):
+            cls.find_element = __countingLookups__(cls.find_element, "find_element")
+    if not getattr(WebDriverWait.until, "__timed__", False):
+        WebDriverWait.until = __countingLookups__(WebDriverWait.until, "wait")
+
+
+def ExportMetrics(run, directory=METRICS_DIRECTORY):
+    ''' Writes <directory>/<run>.prom and appends the run to <directory>/summary.json, then resets the registry '''
+    if not METRICS.enabled:
+        return
+
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, f"{run}.prom"), "w") as file:
+        file.write(METRICS.prometheusText())
+
+    summaryPath = os.path.join(directory, "summary.json")
+    try:
+        with open(summaryPath, "r") as file:
+            runs = json.load(file)
+    except (FileNotFoundError, ValueError):
+        runs = []
+
+    runs.append(METRICS.summary(run))
+    with open(summaryPath, "w") as file:
+        json.dump(runs[-SUMMARY_RUNS:], file, indent=4)
+
+    METRICS.reset()
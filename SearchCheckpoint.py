@@ -0,0 +1,51 @@
+import sqlite3
+import threading
+import time
+
+"""
+SearchCheckpoint
+
+Description:
+    Persisted per-query cursor for people searches: (query, last completed page, maxPageCount).
+    LinkedInPeopleSearch saves it after every results page whose URLs were queued, so a query that
+    fails on page 87 resumes at page 88 on the next run instead of re-fetching pages 1 to 86.
+    Lives next to the work queues (same SQLite file by default).
+"""
+
+
+class SearchCheckpoint:
+    def __init__(self, path):
+        self.path = path
+        # Saved from every session harvesting pages of a query
+        self.__lock__ = threading.Lock()
+        self.__connection__ = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self.__lock__:
+            self.__connection__.execute(
+                "CREATE TABLE IF NOT EXISTS search_cursors (query TEXT PRIMARY KEY, "
+                "last_page INTEGER NOT NULL, max_page_count INTEGER NOT NULL, updated_at REAL NOT NULL)")
+
+    def get(self, query):
+        ''' Returns (last completed page, maxPageCount) of an unfinished query, or None '''
+        with self.__lock__:
+            row = self.__connection__.execute(
+                "SELECT last_page, max_page_count FROM search_cursors WHERE query = ?", (query,)).fetchone()
+
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    def save(self, query, lastPage, maxPageCount):
+        with self.__lock__:
+            self.__connection__.execute(
+                "INSERT OR REPLACE INTO search_cursors (query, last_page, max_page_count, updated_at) "
+                "VALUES (?, ?, ?, ?)", (query, lastPage, maxPageCount, time.time()))
+
+    def clear(self, query):
+        ''' Forgets the cursor of a query once all of its pages were harvested '''
+        with self.__lock__:
+            self.__connection__.execute("DELETE FROM search_cursors WHERE query = ?", (query,))
+
+    def close(self):
+        with self.__lock__:
+            self.__connection__.close()
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.wait import WebDriverWait
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+"""
+SessionStore
+
+Description:
+    Encrypted local store of logged-in LinkedIn sessions (cookies and localStorage), keyed by username.
+    LinkedInScraper saves its session after a successful login and restores it on the next start,
+    so a scheduled run skips the login form, the waits for the feed and the PIN prompt unless the
+    restored session is no longer accepted.
+    The store is encrypted with Fernet (pip install cryptography). The key comes from the
+    LINKEDIN_SESSION_KEY environment variable, or from a key file created next to the store.
+    Without cryptography sessions are not persisted at all, never written in plain text.
+"""
+
+SESSION_STORE_PATH = "session.store"
+SESSION_KEY_PATH = "session.key"
+SESSION_KEY_VARIABLE = "LINKEDIN_SESSION_KEY"
+
+# Same-origin page that loads fast, opened so cookies and localStorage can be set for the domain
+SESSION_ORIGIN_URL = "https://www.linkedin.com/robots.txt"
+SESSION_CHECK_URL = "https://www.linkedin.com/feed/"
+# Seconds the feed gets to show up before the restored session is considered invalid
+SESSION_CHECK_TIMEOUT = 5
+
+__READ_LOCAL_STORAGE__ = """
+var items = {};
+for (var i = 0; i < window.localStorage.length; i++) {
+    var key = window.localStorage.key(i);
+    items[key] = window.localStorage.getItem(key);
+}
+return items;
+"""
+__WRITE_LOCAL_STORAGE__ = """
+var items = arguments[0];
+for (var key in items) {
+    window.localStorage.setItem(key, items[key]);
+}
+"""
+
+
+class SessionStore:
+    def __init__(self, path=SESSION_STORE_PATH, keyPath=SESSION_KEY_PATH):
+        self.path = path
+        self.keyPath = keyPath
+        # Sessions of every worker are saved to the same file
+        self.__lock__ = threading.Lock()
+        self.__fernet__ = None
+
+        if Fernet is None:
+            print("WARNING: cryptography is not installed, sessions will not be persisted")
+        else:
+            self.__fernet__ = Fernet(self.__loadKey__())
+
+    @property
+    def enabled(self):
+        return self.__fernet__ is not None
+
+    def __loadKey__(self):
+        key = os.environ.get(SESSION_KEY_VARIABLE)
+        if key:
+            return key.encode()
+
+        try:
+            return self.__readKeyFile__()
+        except FileNotFoundError:
+            pass
+
+        key = Fernet.generate_key()
+        try:
+            # Readable by the owner only
+            descriptor = os.open(self.keyPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # Another run created it first
+            return self.__readKeyFile__()
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(key)
+        return key
+
+    def __readKeyFile__(self):
+        # The creator may not have written the key yet
+        for _ in range(50):
+            with open(self.keyPath, "rb") as file:
+                key = file.read().strip()
+            if key:
+                return key
+            time.sleep(0.1)
+        raise ValueError(f"{self.keyPath} is empty")
+
+    def __read__(self):
+        try:
+            with open(self.path, "rb") as file:
+                return json.loads(self.__fernet__.decrypt(file.read()))
+        except FileNotFoundError:
+            return {}
+        except (InvalidToken, ValueError):
+            print("WARNING: Session store could not be decrypted, ignoring it")
+            return {}
+
+    def __write__(self, sessions):
+        temporaryPath = self.path + ".tmp"
+        descriptor = os.open(temporaryPath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(self.__fernet__.encrypt(json.dumps(sessions).encode()))
+        # Readers never see a partially written store
+        os.replace(temporaryPath, self.path)
+
+    def save(self, username, driver):
+        ''' Saves the cookies and localStorage of a logged-in session '''
+        if not self.enabled:
+            return
+
+        session = {"cookies": driver.get_cookies(),
+                   "localStorage": driver.execute_script(__READ_LOCAL_STORAGE__),
+                   "saved_at": time.time()}
+        with self.__lock__:
+            sessions = self.__read__()
+            sessions[username] = session
+            self.__write__(sessions)
+
+    def load(self, username):
+        if not self.enabled:
+            return None
+        with self.__lock__:
+            return self.__read__().get(username)
+
+    def discard(self, username):
+        if not self.enabled:
+            return
+        with self.__lock__:
+            sessions = self.__read__()
+            if sessions.pop(username, None) is not None:
+                self.__write__(sessions)
+
+    def restore(self, username, driver):
+        ''' Loads the saved session of username into driver; True if LinkedIn still accepts it '''
+        session = self.load(username)
+        if session is None:
+            return False
+
+        try:
+            driver.get(SESSION_ORIGIN_URL)
+            for cookie in session["cookies"]:
+                # Chrome rejects fractional expiry times
+                if "expiry" in cookie:
+                    cookie["expiry"] = int(cookie["expiry"])
+                try:
+                    driver.add_cookie(cookie)
+                except WebDriverException:
+                    # Cookies of other domains (e.g. the ads subdomains) cannot be set from this origin
+                    pass
+            driver.execute_script(__WRITE_LOCAL_STORAGE__, session["localStorage"])
+
+            driver.get(SESSION_CHECK_URL)
+            WebDriverWait(driver, SESSION_CHECK_TIMEOUT).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR,
+                     "#voyager-feed")))
+        except TimeoutException:
+            print("Saved session for", username, "expired, logging in")
+            self.discard(username)
+            return False
+        except WebDriverException as error:
+            print("Saved session for", username, "could not be restored:", error)
+            return False
+
+        return True
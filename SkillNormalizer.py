@@ -0,0 +1,90 @@
+import json
+import re
+import sys
+
+"""
+SkillNormalizer
+
+Description:
+    Maps the raw skill strings scraped from profiles to one canonical name per skill before insert,
+    so "Python", "python" and "Python (Programming Language)" share a single skills row.
+    Skills are compared by a canonical key (case, punctuation and parenthetical qualifiers removed);
+    the alias table (skillAliases.json: canonical name -> aliases) merges names that differ beyond that.
+    A key without an alias keeps the first name it was seen with, starting with the names already
+    in the database (LinkedInDB.warmCaches), so existing rows are reused.
+"""
+
+SKILL_ALIASES_PATH = "skillAliases.json"
+
+__PARENTHETICAL__ = re.compile(r"\s*\([^)]*\)")
+# C++, C#, .NET and Node.js keep the characters that tell them apart
+__PUNCTUATION__ = re.compile(r"[^\w\s+#.]")
+__WHITESPACE__ = re.compile(r"\s+")
+
+
+def CanonicalSkillKey(skill):
+    key = __PARENTHETICAL__.sub("", skill) or skill
+    key = __PUNCTUATION__.sub(" ", key.lower())
+    return __WHITESPACE__.sub(" ", key).strip(" .")
+
+
+class SkillNormalizer:
+    def __init__(self, aliases=None):
+        # Canonical key -> canonical name
+        self.__names__ = {}
+        # Raw skill -> canonical name, most raw strings repeat across profiles
+        self.__resolved__ = {}
+
+        for name, names in (aliases or {}).items():
+            name = sys.intern(name.strip())
+            for alias in [name] + list(names):
+                key = CanonicalSkillKey(alias)
+                if key:
+                    self.__names__[key] = name
+
+    @classmethod
+    def fromFile(cls, path=SKILL_ALIASES_PATH):
+        ''' Loads the alias table at path; a missing file means no aliases '''
+        try:
+            with open(path, "r") as file:
+                return cls(json.load(file))
+        except FileNotFoundError:
+            return cls()
+
+    def learn(self, names):
+        ''' Registers names (e.g. those already in the database) as canonical unless their key has one '''
+        for name in names:
+            key = CanonicalSkillKey(name)
+            if key and key not in self.__names__:
+                self.__names__[key] = sys.intern(name)
+
+    def canonical(self, skill):
+        ''' The canonical name of a raw skill string '''
+        name = self.__resolved__.get(skill)
+        if name is not None:
+            return name
+
+        key = CanonicalSkillKey(skill)
+        name = self.__names__.get(key)
+        if name is None:
+            name = sys.intern(skill.strip())
+            if key:
+                self.__names__[key] = name
+
+        self.__resolved__[skill] = name
+        return name
+
+    def normalize(self, skills):
+        ''' Category -> canonical skill names, each skill listed once per profile (first category wins) '''
+        normalized = {}
+        seen = set()
+        for category, names in (skills or {}).items():
+            for skill in names:
+                name = self.canonical(skill)
+                if name not in seen:
+                    seen.add(name)
+                    normalized.setdefault(category, []).append(name)
+        return normalized
+
+    def __len__(self):
+        return len(self.__names__)
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import math
+import mmap
+import os
+
+"""
+URLIndex
+
+Description:
+    Constant-time membership structures for employee URLs.
+    OrderedURLSet keeps the backlog in discovery order with list-like append/iteration/indexing.
+    ProfileURLIndex answers "is this profile already in the database", either exactly (set) or
+    with a fixed-size Bloom filter so memory stays bounded at millions of profiles.
+    A Bloom filter index can be memory-mapped from a file, so it survives between runs and
+    only the profiles inserted since its high-water mark have to be loaded again.
+"""
+
+
+def ProfileId(URL):
+    ''' Profile id of an employee URL (the last path segment), which is what the database stores as user_url '''
+    return URL.rstrip("/").rsplit("/", 1)[-1]
+
+
+def StripQueryString(link):
+    ''' Format link to only include profile URL '''
+    return link.split("?", 1)[0]
+
+
+class OrderedURLSet:
+    ''' Insertion-ordered set with the list operations the scraper uses on its backlog '''
+
+    def __init__(self, URLs=()):
+        # dicts keep insertion order
+        self.__URLs__ = dict.fromkeys(URLs)
+        self.__list__ = None
+
+    def append(self, URL):
+        ''' Adds URL if it is new; returns whether it was added '''
+        if URL in self.__URLs__:
+            return False
+
+        self.__URLs__[URL] = None
+        if self.__list__ is not None:
+            self.__list__.append(URL)
+        return True
+
+    def extend(self, URLs):
+        for URL in URLs:
+            self.append(URL)
+
+    def remove(self, URL):
+        del self.__URLs__[URL]
+        self.__list__ = None
+
+    def __contains__(self, URL):
+        return URL in self.__URLs__
+
+    def __iter__(self):
+        return iter(self.__URLs__)
+
+    def __len__(self):
+        return len(self.__URLs__)
+
+    def __getitem__(self, index):
+        # Positional access (and slicing) is rare, so the list view is only built on demand
+        if self.__list__ is None:
+            self.__list__ = list(self.__URLs__)
+        return self.__list__[index]
+
+
+class BloomFilter:
+    ''' Fixed-size set membership with no false negatives and a bounded false positive rate '''
+
+    def __init__(self, capacity, errorRate=0.001, path=None):
+        self.capacity = capacity
+        self.errorRate = errorRate
+        self.bitCount = max(int(-capacity * math.log(errorRate) / (math.log(2) ** 2)), 8)
+        self.hashCount = max(int(round(self.bitCount / capacity * math.log(2))), 1)
+        self.count = 0
+
+        size = (self.bitCount + 7) // 8
+        self.__file__ = None
+        if path is None:
+            self.__bits__ = bytearray(size)
+        else:
+            # Bits live in the page cache and are written back by the OS
+            self.__file__ = open(path, "a+b")
+            if os.path.getsize(path) != size:
+                self.__file__.truncate(0)
+                self.__file__.truncate(size)
+            self.__bits__ = mmap.mmap(self.__file__.fileno(), size)
+
+    def __positions__(self, item):
+        # Double hashing: derive every position from two halves of a single digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bitCount for i in range(self.hashCount)]
+
+    def add(self, item):
+        for position in self.__positions__(item):
+            self.__bits__[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.__bits__[position >> 3] & (1 << (position & 7))
+                   for position in self.__positions__(item))
+
+    def __len__(self):
+        # Number of items added (duplicates included)
+        return self.count
+
+    def clear(self):
+        self.__bits__[:] = bytes(len(self.__bits__))
+        self.count = 0
+
+    def flush(self):
+        if self.__file__ is not None:
+            self.__bits__.flush()
+
+    def close(self):
+        if self.__file__ is not None:
+            self.__bits__.close()
+            self.__file__.close()
+            self.__file__ = None
+
+
+class ProfileURLIndex:
+    ''' Profiles known to the database, looked up by URL or profile id '''
+
+    def __init__(self, bloom=False, capacity=5000000, errorRate=0.001, path=None):
+        # Highest employees.id merged into the index
+        self.highWaterMark = 0
+        self.path = path if bloom else None
+
+        if not bloom:
+            self.__ids__ = set()
+            return
+
+        self.__ids__ = BloomFilter(capacity, errorRate, self.path)
+
+        if self.path is not None:
+            state = None
+            try:
+                with open(self.path + ".json", "r") as file:
+                    state = json.load(file)
+            except (FileNotFoundError, ValueError):
+                pass
+
+            # Bits written with other parameters (or without a recorded state) can't be trusted
+            if state and state["capacity"] == capacity and state["errorRate"] == errorRate:
+                self.highWaterMark = state["highWaterMark"]
+                self.__ids__.count = state["count"]
+            else:
+                self.__ids__.clear()
+
+    def add(self, URL):
+        self.__ids__.add(ProfileId(URL))
+
+    def update(self, URLs):
+        for URL in URLs:
+            self.add(URL)
+
+    def __contains__(self, URL):
+        return ProfileId(URL) in self.__ids__
+
+    def __len__(self):
+        return len(self.__ids__)
+
+    def flush(self):
+        ''' Persists a memory-mapped index together with its high-water mark '''
+        if self.path is None:
+            return
+
+        # Bits first: a high-water mark that lags behind the bits only means reloading a few profiles
+        self.__ids__.flush()
+        with open(self.path + ".json", "w") as file:
+            json.dump({"capacity": self.__ids__.capacity, "errorRate": self.__ids__.errorRate,
+                       "highWaterMark": self.highWaterMark, "count": self.__ids__.count}, file)
@@ -0,0 +1,221 @@
+import sqlite3
+import sys
+import threading
+import time
+
+"""
+WorkQueue
+
+Description:
+    Durable, transactional work queue in a local SQLite file.
+    Replaces rewriting employeeURLs.txt and queries.txt in full: every item moves through
+    pending -> in_progress -> done/failed with a single indexed UPDATE, so a crash loses nothing
+    and the cost of claiming or acknowledging an item does not grow with the backlog.
+    Several named queues can live in the same file.
+"""
+
+WORK_QUEUE_PATH = "workQueue.db"
+
+# Names of the queues used by LinkedInURLPopulation and LinkedInProfileExtraction
+EMPLOYEE_URL_QUEUE = "employeeURLs"
+QUERY_QUEUE = "queries"
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkQueue:
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        # A queue may be shared by several scraper sessions (threads) in the process
+        self.__lock__ = threading.Lock()
+        self.__connection__ = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.__connection__.execute("PRAGMA journal_mode=WAL")
+        self.__createTables__()
+
+    def __createTables__(self):
+        with self.__lock__:
+            self.__connection__.execute(
+                "CREATE TABLE IF NOT EXISTS work_items (id INTEGER PRIMARY KEY, queue TEXT NOT NULL, "
+                "item TEXT NOT NULL, state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "position INTEGER NOT NULL, updated_at REAL NOT NULL, UNIQUE (queue, item))")
+            self.__connection__.execute(
+                "CREATE INDEX IF NOT EXISTS work_items_claim ON work_items (queue, state, position)")
+
+    def __transaction__(self, statements):
+        # Runs (sql, parameters) pairs atomically; the connection is in autocommit mode otherwise
+        with self.__lock__:
+            cursor = self.__connection__.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                results = [cursor.execute(sql, parameters).fetchall() for sql, parameters in statements]
+                cursor.execute("COMMIT")
+            except:
+                cursor.execute("ROLLBACK")
+                raise
+            return results
+
+    def __nextPosition__(self):
+        return "(SELECT COALESCE(MAX(position), 0) + 1 FROM work_items WHERE queue = ?)"
+
+    def put(self, items):
+        ''' Appends items that were never queued before (in any state); returns how many were added '''
+        added = 0
+        now = time.time()
+        with self.__lock__:
+            cursor = self.__connection__.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                position = cursor.execute("SELECT COALESCE(MAX(position), 0) FROM work_items WHERE queue = ?",
+                                          (self.name,)).fetchone()[0]
+                for item in items:
+                    position += 1
+                    cursor.execute("INSERT OR IGNORE INTO work_items (queue, item, state, position, updated_at) "
+                                   "VALUES (?, ?, ?, ?, ?)", (self.name, item, PENDING, position, now))
+                    added += cursor.rowcount
+                cursor.execute("COMMIT")
+            except:
+                cursor.execute("ROLLBACK")
+                raise
+        return added
+
+    def replacePending(self, items):
+        '''
+        Atomically makes items, in this order, the pending contents of the queue: pending items not
+        in items are removed, the others are reordered, and items never queued before are added.
+        Items in progress, done or failed are left alone. Returns (added, removed).
+        '''
+        now = time.time()
+        with self.__lock__:
+            cursor = self.__connection__.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                pending = {item for item, in cursor.execute(
+                    "SELECT item FROM work_items WHERE queue = ? AND state = ?", (self.name, PENDING))}
+                wanted = set(items)
+                removed = pending - wanted
+                cursor.executemany("DELETE FROM work_items WHERE queue = ? AND item = ? AND state = ?",
+                                   [(self.name, item, PENDING) for item in removed])
+
+                added = 0
+                position = cursor.execute("SELECT COALESCE(MAX(position), 0) FROM work_items WHERE queue = ?",
+                                          (self.name,)).fetchone()[0]
+                for item in dict.fromkeys(items):
+                    position += 1
+                    if item in pending:
+                        cursor.execute("UPDATE work_items SET position = ?, updated_at = ? "
+                                       "WHERE queue = ? AND item = ?", (position, now, self.name, item))
+                    else:
+                        cursor.execute("INSERT OR IGNORE INTO work_items (queue, item, state, position, updated_at) "
+                                       "VALUES (?, ?, ?, ?, ?)", (self.name, item, PENDING, position, now))
+                        added += cursor.rowcount
+                cursor.execute("COMMIT")
+            except:
+                cursor.execute("ROLLBACK")
+                raise
+        return added, len(removed)
+
+    def claim(self):
+        ''' Marks the oldest pending item as in progress and returns it, or None if there is none '''
+        with self.__lock__:
+            cursor = self.__connection__.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                row = cursor.execute("SELECT id, item FROM work_items WHERE queue = ? AND state = ? "
+                                     "ORDER BY position LIMIT 1", (self.name, PENDING)).fetchone()
+                if row is not None:
+                    cursor.execute("UPDATE work_items SET state = ?, attempts = attempts + 1, updated_at = ? "
+                                   "WHERE id = ?", (IN_PROGRESS, time.time(), row[0]))
+                cursor.execute("COMMIT")
+            except:
+                cursor.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        return row[1]
+
+    def ack(self, item):
+        ''' Marks an item as done '''
+        self.ackAll([item])
+
+    def ackAll(self, items):
+        now = time.time()
+        self.__transaction__([("UPDATE work_items SET state = ?, updated_at = ? WHERE queue = ? AND item = ?",
+                               (DONE, now, self.name, item)) for item in items])
+
+    def fail(self, item, maxAttempts=1):
+        '''
+        Records a failed attempt. The item goes to the back of the queue to be retried
+        until it has been attempted maxAttempts times, then it is marked as failed.
+        '''
+        now = time.time()
+        self.__transaction__([
+            ("UPDATE work_items SET state = ?, updated_at = ? WHERE queue = ? AND item = ? AND attempts >= ?",
+             (FAILED, now, self.name, item, maxAttempts)),
+            ("UPDATE work_items SET state = ?, position = " + self.__nextPosition__() + ", updated_at = ? "
+             "WHERE queue = ? AND item = ? AND state = ?",
+             (PENDING, self.name, now, self.name, item, IN_PROGRESS)),
+        ])
+
+    def release(self, item):
+        ''' Returns an in progress item to the front of the queue without counting the attempt '''
+        self.__transaction__([("UPDATE work_items SET state = ?, attempts = attempts - 1, updated_at = ? "
+                               "WHERE queue = ? AND item = ? AND state = ?",
+                               (PENDING, time.time(), self.name, item, IN_PROGRESS))])
+
+    def recover(self):
+        ''' Returns items left in progress by a run that crashed to the queue '''
+        self.__transaction__([("UPDATE work_items SET state = ?, attempts = attempts - 1, updated_at = ? "
+                               "WHERE queue = ? AND state = ?",
+                               (PENDING, time.time(), self.name, IN_PROGRESS))])
+
+    def pending(self):
+        ''' Pending items in queue order '''
+        with self.__lock__:
+            rows = self.__connection__.execute("SELECT item FROM work_items WHERE queue = ? AND state = ? "
+                                               "ORDER BY position", (self.name, PENDING)).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self):
+        ''' Number of items in each state '''
+        with self.__lock__:
+            rows = self.__connection__.execute("SELECT state, COUNT(*) FROM work_items WHERE queue = ? "
+                                               "GROUP BY state", (self.name,)).fetchall()
+        return dict(rows)
+
+    def __contains__(self, item):
+        with self.__lock__:
+            row = self.__connection__.execute("SELECT 1 FROM work_items WHERE queue = ? AND item = ?",
+                                              (self.name, item)).fetchone()
+        return row is not None
+
+    def importTextFile(self, textFilePath):
+        ''' One-time import of a text file with one item per line (e.g. employeeURLs.txt) '''
+        with open(textFilePath, "r") as file:
+            items = [line.strip() for line in file if line.strip()]
+        return self.put(items)
+
+    def close(self):
+        with self.__lock__:
+            self.__connection__.close()
+
+
+# Driver Code
+# Usage: python WorkQueue.py [employeeURLs.txt] [queries.txt]
+if __name__ == "__main__":
+    employeeURLsFile = sys.argv[1] if len(sys.argv) > 1 else "employeeURLs.txt"
+    queriesFile = sys.argv[2] if len(sys.argv) > 2 else "queries.txt"
+
+    for textFilePath, name in ((employeeURLsFile, EMPLOYEE_URL_QUEUE), (queriesFile, QUERY_QUEUE)):
+        workQueue = WorkQueue(WORK_QUEUE_PATH, name)
+        try:
+            print("Imported", workQueue.importTextFile(textFilePath), "new items from", textFilePath,
+                  "into the", name, "queue")
+        except FileNotFoundError:
+            print(textFilePath, "not found, skipping")
+        workQueue.close()